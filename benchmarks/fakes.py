@@ -0,0 +1,237 @@
+"""Deterministic local stand-ins for Gemini, Tesseract/poppler, Google Translate,
+LlamaParse, YouTube transcripts and Mistral.
+
+Every fake shares a ``Backend`` that sleeps for a configurable latency (plus
+seeded jitter) and raises ``FakeBackendError`` at a configurable rate, so the
+real pipeline code in ``services`` can be timed without network or API keys.
+Use ``install(backend)`` as a context manager to patch them all in.
+"""
+import asyncio
+import contextlib
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+# Gemini bills an inline image as a fixed number of tokens.
+IMAGE_TOKENS = 258
+
+
+class FakeBackendError(Exception):
+    """Raised by a fake backend to simulate an API failure."""
+
+
+class Backend:
+    """Latency and failure injection shared by all fakes."""
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _draw(self, name):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            fail = self._rng.random() < self.failure_rate
+        return delay, fail
+
+    def call(self, name):
+        delay, fail = self._draw(name)
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise FakeBackendError(f"injected {name} failure")
+
+    async def acall(self, name):
+        delay, fail = self._draw(name)
+        if delay:
+            await asyncio.sleep(delay)
+        if fail:
+            raise FakeBackendError(f"injected {name} failure")
+
+
+def _tokens(parts):
+    total = 0
+    for part in parts:
+        if isinstance(part, str):
+            total += len(part) // 4
+        else:
+            total += IMAGE_TOKENS
+    return total
+
+
+def default_responder(system_instruction, parts):
+    """Canned model output: JSON for the prescription prompt, markdown otherwise."""
+    if system_instruction and "medical transcriptionist" in system_instruction:
+        return json.dumps(PRESCRIPTION_RESPONSE)
+    words = sum(len(p.split()) for p in parts if isinstance(p, str))
+    return "\n".join(f"{i}. Finding {i}: derived from {words} words of input." for i in range(1, 11))
+
+
+PRESCRIPTION_RESPONSE = {
+    "patient_name": "Asha Rao",
+    "patient_age": 42,
+    "patient_gender": "Female",
+    "doctor_name": "Dr. K. Menon",
+    "doctor_license": "KMC-104233",
+    "prescription_date": "2024-03-18",
+    "medications": [
+        {"name": "Amoxicillin", "dosage": "500 mg", "frequency": "3 times a day", "duration": "5 days"},
+        {"name": "Paracetamol", "dosage": "650 mg", "frequency": "as needed", "duration": "3 days"},
+    ],
+    "additional_notes": "Take after food\nReview after one week",
+}
+
+
+def fake_gemini(backend, responder=default_responder):
+    """Returns (GenerativeModel, CachedContent.create) replacements."""
+
+    class FakeCachedContent:
+        def __init__(self, model, system_instruction, contents):
+            self.model = model
+            self.system_instruction = system_instruction
+            self.contents = contents or []
+            self.token_count = _tokens([system_instruction or "", *self.contents])
+
+    def create(model, display_name=None, system_instruction=None, contents=None, ttl=None):
+        backend.call("gemini-cache")
+        return FakeCachedContent(model, system_instruction, contents)
+
+    class FakeGenerativeModel:
+        def __init__(self, model_name="", system_instruction=None, generation_config=None,
+                     safety_settings=None, cached_content=None):
+            self.model_name = model_name
+            self.system_instruction = system_instruction
+            self.cached_content = cached_content
+
+        @classmethod
+        def from_cached_content(cls, cached_content, generation_config=None, safety_settings=None):
+            return cls(cached_content.model, cached_content.system_instruction,
+                       cached_content=cached_content)
+
+        def generate_content(self, parts, **kwargs):
+            if not isinstance(parts, list):
+                parts = [parts]
+            backend.call("gemini")
+            cached = self.cached_content.token_count if self.cached_content else 0
+            prompt = _tokens([self.system_instruction or "", *parts]) if not cached else cached + _tokens(parts)
+            text = responder(self.system_instruction, parts)
+            usage = SimpleNamespace(prompt_token_count=prompt, cached_content_token_count=cached,
+                                    candidates_token_count=len(text) // 4)
+            return SimpleNamespace(text=text, usage_metadata=usage)
+
+    return FakeGenerativeModel, create
+
+
+def fake_image_to_string(backend):
+    def image_to_string(image, *args, **kwargs):
+        backend.call("ocr")
+        width, height = image.size
+        return "\n".join(f"Notice line {i}: the office will remain closed on {i} March."
+                         for i in range(1, max(2, height // 40)))
+    return image_to_string
+
+
+def fake_convert_from_bytes(backend):
+    """pdf2image replacement: one blank page image per PDF page."""
+    def convert_from_bytes(data, *args, **kwargs):
+        import io
+        import PyPDF2
+        from PIL import Image
+        backend.call("pdf-render")
+        pages = len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+        return [Image.new("L", (850, 1100), 255) for _ in range(pages)]
+    return convert_from_bytes
+
+
+def fake_convert_from_path(backend):
+    convert_from_bytes = fake_convert_from_bytes(backend)
+
+    def convert_from_path(path, *args, **kwargs):
+        with open(path, "rb") as f:
+            return convert_from_bytes(f.read())
+    return convert_from_path
+
+
+class FakeTranslateClient:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def translate(self, text, target_language):
+        self.backend.call("translate")
+        return {"translatedText": f"[{target_language}] {text}"}
+
+
+class FakeLlamaParse:
+    """Async LlamaParse stand-in: one document per 2 KB of input."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def aload_data(self, path):
+        await self.backend.acall("llamaparse")
+        with open(path, "rb") as f:
+            size = len(f.read())
+        return [SimpleNamespace(text=f"Page {i + 1} of {path}\n" + "lorem ipsum " * 150)
+                for i in range(max(1, size // 2048))]
+
+
+def fake_youtube(backend, transcript):
+    class FakeYouTubeTranscriptApi:
+        @staticmethod
+        def get_transcript(video_id):
+            backend.call("youtube")
+            return [{"text": line} for line in transcript.splitlines() if line]
+    return FakeYouTubeTranscriptApi
+
+
+class FakeMistralSession:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def post(self, url, headers=None, json=None):
+        self.backend.call("mistral")
+        prompt = json["messages"][-1]["content"]
+        story = f"Once upon a time, prompted by '{prompt}', a story unfolded. " * 20
+        return SimpleNamespace(json=lambda: {"choices": [{"message": {"content": story}}]})
+
+
+@contextlib.contextmanager
+def install(backend, transcript=""):
+    """Patches every external backend used by ``services`` with a fake."""
+    import google.generativeai as genai
+    from google.generativeai import caching
+    from services import gemini_cache, parsing, translation
+
+    model_cls, create = fake_gemini(backend)
+    client = FakeTranslateClient(backend)
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(genai, "GenerativeModel", model_cls))
+        stack.enter_context(mock.patch.object(caching.CachedContent, "create", create))
+        stack.enter_context(mock.patch("pytesseract.image_to_string", fake_image_to_string(backend)))
+        stack.enter_context(mock.patch.object(translation, "convert_from_bytes", fake_convert_from_bytes(backend)))
+        stack.enter_context(mock.patch.object(translation, "_client", lambda api_key: client))
+        stack.enter_context(mock.patch.object(parsing, "make_parser",
+                                              lambda result_type="text": FakeLlamaParse(backend)))
+        stack.enter_context(mock.patch("requests.post", FakeMistralSession(backend).post))
+        with contextlib.suppress(ImportError):
+            from services import risk_analysis
+            stack.enter_context(mock.patch.object(risk_analysis, "convert_from_path", fake_convert_from_path(backend)))
+        with contextlib.suppress(ImportError):
+            from services import summarizer
+            stack.enter_context(mock.patch.object(summarizer, "YouTubeTranscriptApi", fake_youtube(backend, transcript)))
+        with contextlib.suppress(ImportError):
+            from services import diagnosis
+            stack.enter_context(mock.patch.object(diagnosis, "_model", None))
+        # Start every run with a cold context cache.
+        gemini_cache._handles.clear()
+        gemini_cache._stats.clear()
+        yield
+        gemini_cache._handles.clear()
+        gemini_cache._stats.clear()
@@ -0,0 +1,413 @@
+"""Concurrent-session load test for the Streamlit gallery.
+
+    python -m benchmarks.loadtest --sessions 1 2 4 8 16 --duration 20 --latency 0.2
+
+For each concurrency level, N simulated users run in parallel threads of one
+process (as sessions do in one ``streamlit run`` replica).  Each user loops
+through the gallery and the app pages with Streamlit's ``AppTest``: uploading
+corpus files, filling inputs and clicking buttons, against the fake backends
+from ``benchmarks.fakes``.  Per-app latency distributions, CPU and RSS over
+time and the level at which throughput stops scaling are written as JSON to
+``benchmarks/results/loadtest-<label>.json``.
+
+The simulated users run in the measured process, so the CPU and RSS figures
+include the load generator (AppTest, the fakes) as well as the apps.  Running
+sessions side by side relies on Streamlit internals patched in
+``shared_runtime``; it was written against Streamlit ``TESTED_STREAMLIT``.
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from datetime import datetime, timezone
+from unittest import mock
+
+from . import fakes
+from .run import CORPUS_DIR, RESULTS_DIR, default_label, percentile, rss_mb
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dummy keys so pages that require one don't stop before rendering.
+FAKE_ENV = {
+    "GEMINI_API_KEY": "fake-key",
+    "GOOGLE_TRANSLATION_API_KEY": "fake-key",
+    "MISTRAL_API_KEY": "fake-key",
+    "LLAMA_CLOUD_API_KEY": "fake-key",
+}
+
+MIME_TYPES = {"pdf": "application/pdf", "png": "image/png", "jpg": "image/jpeg",
+              "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}
+
+# The Streamlit release whose AppTest and Runtime internals shared_runtime patches.
+TESTED_STREAMLIT = "1.66"
+
+JOURNEYS = {}
+
+
+def journey(name, page):
+    """Registers the user actions for one app; ``page`` is relative to the repo root."""
+    def register(fn):
+        JOURNEYS[name] = (page, fn)
+        return fn
+    return register
+
+
+def upload(name, session_id, unique=True):
+    """A corpus file as an upload tuple, made unique per session to defeat result caches."""
+    with open(os.path.join(CORPUS_DIR, name), "rb") as f:
+        data = f.read()
+    if unique and not name.endswith(".docx"):
+        # Trailing bytes are ignored by PDF and image readers.
+        data += f"\n%session-{session_id}-{time.perf_counter_ns()}\n".encode()
+    return (name, data, MIME_TYPES[name.rsplit(".", 1)[-1]])
+
+
+@journey("gallery", "main.py")
+def gallery(at, session_id):
+    pass
+
+
+@journey("risk_analysis", "pages/1_App_Risk_Analysis.py")
+def risk_analysis(at, session_id):
+    at.file_uploader[0].set_value(upload("contract_short.pdf", session_id)).run()
+    at.button[0].click().run()
+    at.text_input[0].set_value("Can the customer terminate early?").run()
+
+
+@journey("document_parser", "pages/2_App_Document_Parser.py")
+def document_parser(at, session_id):
+    at.file_uploader[0].set_value([upload("contract_short.pdf", session_id),
+                                   upload("contract.docx", session_id)]).run()
+
+
+@journey("illness_testing", "pages/3_App_Illness_Testing.py")
+def illness_testing(at, session_id):
+    at.file_uploader[0].set_value(upload("scan.jpg", session_id)).run()
+    at.button[0].click().run()
+
+
+@journey("prescription", "pages/4_App_Medical_Prescription.py")
+def prescription(at, session_id):
+    at.file_uploader[0].set_value(upload("prescription.png", session_id)).run()
+
+
+@journey("diagnosis", "pages/5_App_Multi-modal_Diagnosis.py")
+def diagnosis(at, session_id):
+    at.sidebar.text_area[0].set_value("Persistent dry cough for three weeks.")
+    at.sidebar.file_uploader[0].set_value(upload("scan.jpg", session_id))
+    at.run()
+    at.button[0].click().run()
+
+
+@journey("translation", "pages/6_App_Translation_Service.py")
+def translation(at, session_id):
+    at.file_uploader[0].set_value([upload("notice.pdf", session_id), upload("notice.png", session_id)])
+    at.multiselect[0].set_value(["Hindi", "Kannada"])
+    at.run()
+
+
+@journey("summarizer", "pages/7_App_Youtube_Summarizer.py")
+def summarizer(at, session_id):
+    at.text_input[0].set_value("https://www.youtube.com/watch?v=dQw4w9WgXcQ").run()
+    at.button[0].click().run()
+
+
+@journey("storyteller", "pages/8_App_Story_Teller.py")
+def storyteller(at, session_id):
+    at.text_input[0].set_value("A girl who talks to animals").run()
+    at.button[0].click().run()
+
+
+@journey("archive_search", "pages/9_App_Archive_Search.py")
+def archive_search(at, session_id):
+    at.text_input[0].set_value("customer terminate").run()
+
+
+def run_journey(name, session_id, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    page, steps = JOURNEYS[name]
+    start = time.perf_counter()
+    # Every user lands on the gallery and navigates to the app, as in the browser.
+    at = AppTest.from_file(os.path.join(REPO_DIR, "main.py"), default_timeout=timeout)
+    at.run()
+    if page != "main.py":
+        at.switch_page(page).run()
+    try:
+        if not at.exception:
+            steps(at, session_id)
+    except IndexError:
+        # An expected widget wasn't rendered, usually because the page showed an error.
+        raise RuntimeError("; ".join(e.value for e in at.error) or "expected widget not rendered")
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    # Pages catch backend failures and show them with st.error.
+    if at.error:
+        raise RuntimeError("; ".join(e.value for e in at.error))
+    return elapsed
+
+
+@contextlib.contextmanager
+def shared_runtime():
+    """Lets AppTest runs overlap.
+
+    Each AppTest run installs its own mock ``Runtime`` singleton and resets it
+    to None when done, which breaks any run still in flight on another
+    thread.  A real server shares one runtime between sessions, so every run
+    gets the first runtime created for the whole test, whichever run is
+    current.  This patches private Streamlit attributes, so it checks they
+    exist and warns when Streamlit isn't ``TESTED_STREAMLIT``.
+    """
+    import streamlit
+    from streamlit.runtime.pages_manager import PagesManager
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner import script_runner
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    if not ("_instance" in vars(Runtime) and hasattr(ScriptCache, "get_bytecode")
+            and getattr(script_runner, "PagesManager", None) is PagesManager):
+        raise RuntimeError(f"Streamlit {streamlit.__version__} lacks the internals the load test "
+                           f"patches; install streamlit=={TESTED_STREAMLIT}.*")
+    if not (streamlit.__version__ + ".").startswith(TESTED_STREAMLIT + "."):
+        print(f"warning: load test written for Streamlit {TESTED_STREAMLIT}, running "
+              f"{streamlit.__version__}; concurrent sessions may misbehave", file=sys.stderr)
+
+    shared = []
+    shared_lock = threading.Lock()
+    # One compiled-script cache for the process, as in a real server.  This
+    # also keeps ast.parse off concurrent threads, which CPython 3.11 can't
+    # do safely.
+    shared_cache = ScriptCache()
+    compile_lock = threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def shared_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(shared_cache, script_path)
+
+    def current(cls):
+        with shared_lock:
+            if not shared and cls._instance is not None:
+                shared.append(cls._instance)
+            return shared[0] if shared else None
+
+    def instance(cls):
+        runtime = current(cls)
+        if runtime is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return runtime
+
+    def exists(cls):
+        return current(cls) is not None
+
+    # Every AppTest run resets PagesManager.uses_pages_directory to None, so a
+    # run already executing could fall back to the gallery script instead of
+    # the page it switched to.  All journeys start at main.py, next to pages/.
+    class PagesDirectoryManager(PagesManager):
+        uses_pages_directory = True
+
+    with mock.patch.object(Runtime, "instance", classmethod(instance)), \
+            mock.patch.object(Runtime, "exists", classmethod(exists)), \
+            mock.patch.object(ScriptCache, "get_bytecode", shared_get_bytecode), \
+            mock.patch.object(script_runner, "PagesManager", PagesDirectoryManager):
+        yield
+
+
+class ResourceSampler(threading.Thread):
+    """Samples process CPU % and RSS at a fixed interval.
+
+    This is the whole process, so it includes the simulated users themselves.
+    """
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._done = threading.Event()
+
+    def run(self):
+        start = last_wall = time.perf_counter()
+        last_cpu = sum(os.times()[:2])
+        while not self._done.wait(self.interval):
+            wall, cpu = time.perf_counter(), sum(os.times()[:2])
+            self.samples.append({
+                "t": round(wall - start, 2),
+                "cpu_percent": round(100 * (cpu - last_cpu) / (wall - last_wall), 1),
+                "rss_mb": round(rss_mb(), 1),
+            })
+            last_wall, last_cpu = wall, cpu
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def latency_summary(values):
+    ms = [v * 1000 for v in values]
+    return {
+        "count": len(ms),
+        "p50": _round(percentile(ms, 50)),
+        "p90": _round(percentile(ms, 90)),
+        "p99": _round(percentile(ms, 99)),
+        "max": _round(max(ms) if ms else None),
+    }
+
+
+def _round(value):
+    return round(value, 1) if value is not None else None
+
+
+def run_level(sessions, apps, args):
+    """Runs ``sessions`` concurrent users for ``args.duration`` seconds."""
+    latencies = {name: [] for name in apps}
+    errors = {name: 0 for name in apps}
+    first_error = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def user(session_id):
+        i = session_id  # stagger users across apps
+        while time.perf_counter() < deadline:
+            name = apps[i % len(apps)]
+            i += 1
+            try:
+                elapsed = run_journey(name, session_id, args.timeout)
+                with lock:
+                    latencies[name].append(elapsed)
+            except Exception as e:
+                with lock:
+                    errors[name] += 1
+                    first_error.setdefault(name, f"{type(e).__name__}: {e}")
+
+    sampler = ResourceSampler(args.sample_interval)
+    sampler.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(n,), daemon=True) for n in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    sampler.stop()
+
+    completed = sum(len(v) for v in latencies.values())
+    cpu = [s["cpu_percent"] for s in sampler.samples]
+    rss = [s["rss_mb"] for s in sampler.samples]
+    return {
+        "sessions": sessions,
+        "wall_s": round(wall, 2),
+        "journeys": completed,
+        "errors": sum(errors.values()),
+        "throughput_journeys_s": round(completed / wall, 3),
+        "latency_ms": latency_summary([l for v in latencies.values() for l in v]),
+        "apps": {name: {**latency_summary(latencies[name]), "errors": errors[name],
+                        **({"first_error": first_error[name]} if name in first_error else {})}
+                 for name in apps},
+        "cpu_percent": {"mean": round(sum(cpu) / len(cpu), 1) if cpu else None,
+                        "max": max(cpu) if cpu else None},
+        "rss_mb_max": max(rss) if rss else None,
+        "timeline": sampler.samples,
+    }
+
+
+def find_saturation(levels, min_gain):
+    """The last level whose throughput gain over the previous one was at least ``min_gain``."""
+    saturated = levels[0]["sessions"] if levels else None
+    for previous, current in zip(levels, levels[1:]):
+        if not previous["throughput_journeys_s"]:
+            break
+        if current["throughput_journeys_s"] / previous["throughput_journeys_s"] - 1 < min_gain:
+            break
+        saturated = current["sessions"]
+    return saturated
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__.split("\n")[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="concurrency levels to run, in order")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per level")
+    parser.add_argument("--apps", nargs="+", choices=sorted(JOURNEYS), default=list(JOURNEYS))
+    parser.add_argument("--latency", type=float, default=0.2, help="fake backend latency per call (s)")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="AppTest timeout per script run (s)")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="CPU/RSS sampling period (s)")
+    parser.add_argument("--saturation-gain", type=float, default=0.10,
+                        help="throughput gain below which a level counts as saturated")
+    parser.add_argument("--label", default=None)
+    parser.add_argument("--output", default=None)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    label = args.label or default_label()
+    for key, value in FAKE_ENV.items():
+        os.environ.setdefault(key, value)
+    # Keep load-test results out of the real archive.
+    archive_dir = tempfile.mkdtemp(prefix="loadtest-archive-")
+    os.environ["ARCHIVE_DIR"] = archive_dir
+    # Pages resolve assets such as pages/styles.css against the working directory.
+    os.chdir(REPO_DIR)
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    warnings.filterwarnings("ignore")
+    # Bare-mode AppTest runs log a warning per script run otherwise.
+    import streamlit
+    from streamlit import logger as streamlit_logger
+    streamlit_logger.set_log_level("error")
+    # Overlapping runs briefly reset the level while re-reading config, so
+    # also filter the per-thread warning that AppTest's setup always triggers.
+    streamlit_logger.get_logger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+        lambda record: "missing ScriptRunContext" not in record.getMessage())
+    with open(os.path.join(CORPUS_DIR, "transcript.txt")) as f:
+        transcript = f.read()
+
+    levels = []
+    backend = fakes.Backend(args.latency, args.jitter, args.failure_rate, args.seed)
+    with fakes.install(backend, transcript), shared_runtime():
+        for sessions in args.sessions:
+            result = run_level(sessions, args.apps, args)
+            levels.append(result)
+            lat = result["latency_ms"]
+            print(f"{sessions:4} sessions: {result['throughput_journeys_s']:7.2f} journeys/s  "
+                  f"p50 {lat['p50'] or 0:8.1f} ms  p90 {lat['p90'] or 0:8.1f} ms  "
+                  f"errors {result['errors']:3}  cpu {result['cpu_percent']['mean'] or 0:5.1f}%  "
+                  f"rss {result['rss_mb_max'] or 0:7.1f} MB", flush=True)
+
+    shutil.rmtree(archive_dir, ignore_errors=True)
+
+    saturation = find_saturation(levels, args.saturation_gain)
+    print(f"Throughput stops scaling beyond {saturation} concurrent session(s).")
+    for name, app in levels[-1]["apps"].items() if levels else ():
+        if "first_error" in app:
+            print(f"  {name}: {app['errors']} error(s), e.g. {app['first_error']}")
+
+    report = {
+        "label": label,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "streamlit": streamlit.__version__,
+        "config": {k: getattr(args, k) for k in ("sessions", "duration", "apps", "latency", "jitter",
+                                                  "failure_rate", "seed")},
+        "saturation_sessions": saturation,
+        "levels": levels,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"loadtest-{label}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
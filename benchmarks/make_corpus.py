@@ -0,0 +1,116 @@
+"""Regenerates the bundled benchmark corpus in ``benchmarks/corpus``.
+
+    python -m benchmarks.make_corpus
+
+The content is deterministic (fixed seeds), so results stay comparable
+across versions even if the corpus is regenerated.
+"""
+import os
+import random
+from datetime import datetime
+
+from docx import Document
+from PIL import Image, ImageDraw
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+CLAUSES = [
+    "The Supplier shall indemnify the Customer against all losses arising from breach of this Agreement.",
+    "Either party may terminate this Agreement with thirty days written notice to the other party.",
+    "The Customer shall pay all invoices within fifteen days, failing which interest accrues at 2% per month.",
+    "Liability of the Supplier is limited to the fees paid in the twelve months preceding the claim.",
+    "This Agreement renews automatically for successive one-year terms unless cancelled in writing.",
+    "All intellectual property created under this Agreement vests exclusively in the Supplier.",
+    "The Customer waives any right to a jury trial for disputes arising under this Agreement.",
+    "Confidential information must be protected for five years following termination.",
+]
+
+
+def contract_lines(clauses, seed):
+    rng = random.Random(seed)
+    lines = ["MASTER SERVICES AGREEMENT", ""]
+    for i in range(1, clauses + 1):
+        lines.append(f"{i}. {rng.choice(CLAUSES)}")
+    return lines
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, lines, lines_per_page=40):
+    """Writes a minimal multi-page PDF with a real text layer (no dependencies)."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    pages_obj = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    kids = []
+    for page_lines in pages:
+        text = "BT /F1 10 Tf 12 TL 50 760 Td " + " ".join(
+            f"({_pdf_escape(line)}) '" for line in page_lines) + " ET"
+        stream = text.encode("latin-1")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_obj, font, content)))
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_obj
+    objects[pages_obj - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_docx(path, lines):
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    doc.core_properties.created = doc.core_properties.modified = datetime(2024, 1, 1)
+    doc.save(path)
+
+
+def write_image(path, lines, size=(850, 1100)):
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((40, 40 + 20 * i), line, fill=0)
+    image.save(path)
+
+
+def main():
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    write_pdf(os.path.join(CORPUS_DIR, "contract_short.pdf"), contract_lines(30, seed=1))
+    write_pdf(os.path.join(CORPUS_DIR, "contract_long.pdf"), contract_lines(400, seed=2))
+    write_docx(os.path.join(CORPUS_DIR, "contract.docx"), contract_lines(120, seed=3))
+    notice = ["PUBLIC NOTICE", "", "The district office will remain closed on 14 March.",
+              "Applications may be submitted online until 20 March."]
+    write_pdf(os.path.join(CORPUS_DIR, "notice.pdf"), notice * 30)
+    write_image(os.path.join(CORPUS_DIR, "notice.png"), notice)
+    write_image(os.path.join(CORPUS_DIR, "prescription.png"),
+                ["Dr. K. Menon  KMC-104233", "Asha Rao, 42y, F", "Rx Amoxicillin 500mg TDS x 5d"],
+                size=(600, 400))
+    write_image(os.path.join(CORPUS_DIR, "scan.jpg"), ["chest x-ray, PA view"], size=(512, 512))
+    with open(os.path.join(CORPUS_DIR, "transcript.txt"), "w") as f:
+        rng = random.Random(4)
+        for i in range(600):
+            f.write(f"and in this part of the video we talk about topic {rng.randint(1, 40)} in detail\n")
+
+
+if __name__ == "__main__":
+    main()
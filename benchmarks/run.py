@@ -0,0 +1,395 @@
+"""Offline benchmark suite for the app pipelines.
+
+    python -m benchmarks.run --iterations 20 --workers 4 --latency 0.05
+    python -m benchmarks.run --compare benchmarks/results/v1.json --fail-on-regression
+
+Each scenario drives the real code in ``services`` over the bundled corpus
+with every external backend replaced by a fake from ``benchmarks.fakes``.
+Throughput, latency percentiles and peak memory are printed and written as
+JSON to ``benchmarks/results/<label>.json``.  Memory is measured in a
+separate pass so tracemalloc's overhead doesn't skew the timings: the Python
+heap peak from tracemalloc, and the process RSS, which also covers native
+buffers such as PIL images and lxml trees.  The run exits non-zero if any
+scenario had to be skipped.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from . import fakes
+
+BENCH_DIR = os.path.dirname(__file__)
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+SYMPTOMS = "Persistent dry cough for three weeks, mild fever in the evenings, history of asthma."
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    """Registers a function returning the list of zero-argument operations to time."""
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+def raise_on_errors(name, errors):
+    """Fails the op for pipelines that report backend errors instead of raising."""
+    errors = [e for e in errors if e]
+    if errors:
+        raise RuntimeError(f"{name}: {len(errors)} failed result(s), first: {errors[0]}")
+
+
+def corpus_files(*extensions):
+    return [os.path.join(CORPUS_DIR, name) for name in sorted(os.listdir(CORPUS_DIR))
+            if name.rsplit(".", 1)[-1] in extensions]
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@scenario("extraction")
+def extraction(backend):
+    from services.risk_analysis import extract_text
+
+    def op(path):
+        with open(path, "rb") as f:
+            return extract_text(f, path.rsplit(".", 1)[-1])
+    return [lambda p=p: op(p) for p in corpus_files("pdf", "docx", "png", "jpg")]
+
+
+@scenario("prompt_construction")
+def prompt_construction(backend):
+    from services.diagnosis import build_prompt
+    from services.risk_analysis import contract_model, extract_text_from_pdf
+
+    with open(os.path.join(CORPUS_DIR, "contract_long.pdf"), "rb") as f:
+        contract = extract_text_from_pdf(f)
+    return [lambda: contract_model(contract), lambda: build_prompt(SYMPTOMS, image=True, audio=True)]
+
+
+@scenario("risk_analysis")
+def risk_analysis(backend):
+    from services.risk_analysis import analyze_file
+    return [lambda p=p: analyze_file(p) for p in corpus_files("pdf", "docx") if "contract" in p]
+
+
+@scenario("risk_follow_up")
+def risk_follow_up(backend):
+    # Repeated questions against one contract exercise the cached prefix.
+    from services.risk_analysis import ask_about_contract, extract_text_from_pdf
+
+    with open(os.path.join(CORPUS_DIR, "contract_long.pdf"), "rb") as f:
+        contract = extract_text_from_pdf(f)
+    questions = ["Who bears liability for data loss?", "Can the customer terminate early?",
+                 "What are the payment terms?"]
+    return [lambda q=q: ask_about_contract(contract, q) for q in questions]
+
+
+@scenario("illness_testing")
+def illness_testing(backend):
+    from services.illness_testing import analyze_file
+    return [lambda p=p: analyze_file(p) for p in corpus_files("png", "jpg")]
+
+
+@scenario("prescription_parsing")
+def prescription_parsing(backend):
+    from services.prescription import analyze_file
+    return [lambda: analyze_file(os.path.join(CORPUS_DIR, "prescription.png"))]
+
+
+@scenario("response_parsing")
+def response_parsing(backend):
+    # Page 4's JsonOutputParser on its own, without the model call.
+    from langchain_core.output_parsers import JsonOutputParser
+    from services.prescription import PrescriptionInformations
+
+    parser = JsonOutputParser(pydantic_object=PrescriptionInformations)
+    text = "```json\n" + json.dumps(fakes.PRESCRIPTION_RESPONSE) + "\n```"
+    return [lambda: parser.parse(text)]
+
+
+@scenario("diagnosis")
+def diagnosis(backend):
+    from services.diagnosis import diagnose
+    return [lambda: diagnose(SYMPTOMS), lambda: diagnose(SYMPTOMS, os.path.join(CORPUS_DIR, "scan.jpg"))]
+
+
+@scenario("translation_ocr")
+def translation_ocr(backend):
+    from services.translation import extract_text
+    return [lambda p=p: extract_text(os.path.basename(p), read(p)) for p in corpus_files("pdf", "png")
+            if "notice" in p]
+
+
+@scenario("translation_fanout")
+def translation_fanout(backend):
+    from services.translation import create_zip, translate_files
+
+    files = [(os.path.basename(p), read(p)) for p in corpus_files("pdf", "png") if "notice" in p]
+
+    def op():
+        results = translate_files(files, ["Hindi", "Kannada", "Tamil"], "fake-key")
+        raise_on_errors("translate_files", [r.errors for r in results])
+        return create_zip(results)
+    return [op]
+
+
+@scenario("docx_generation")
+def docx_generation(backend):
+    from services.risk_analysis import extract_text_from_pdf
+    from services.translation import create_docx
+
+    with open(os.path.join(CORPUS_DIR, "contract_long.pdf"), "rb") as f:
+        contract = extract_text_from_pdf(f)
+    return [lambda: create_docx(contract)]
+
+
+@scenario("document_parser")
+def document_parser(backend):
+    from services.parsing import parse_files
+
+    files = [(os.path.basename(p), read(p)) for p in corpus_files("pdf", "docx", "jpg")]
+    parser = fakes.FakeLlamaParse(backend)
+
+    def op():
+        parsed = list(parse_files(files, workers=4, parser=parser))
+        raise_on_errors("parse_files", [p.error for p in parsed])
+        return parsed
+    return [op]
+
+
+@scenario("summarizer")
+def summarizer(backend):
+    from services.summarizer import summarize_video
+    return [lambda: summarize_video("https://www.youtube.com/watch?v=dQw4w9WgXcQ")]
+
+
+@scenario("storyteller")
+def storyteller(backend):
+    from services.storyteller import generate_story
+
+    session = fakes.FakeMistralSession(backend)
+    return [lambda: generate_story("A girl who talks to animals", "fake-key", session=session)]
+
+
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+class PeakRss(threading.Thread):
+    """Tracks the highest process RSS seen while running, sampled every ``interval``."""
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.start_mb = self.peak_mb = rss_mb()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, rss_mb())
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self.join()
+        self.peak_mb = max(self.peak_mb, rss_mb())
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_scenario(name, backend, args):
+    try:
+        ops = SCENARIOS[name](backend)
+    except ImportError as e:
+        return {"skipped": f"missing dependency: {e}"}
+
+    latencies = []
+    errors = 0
+
+    def timed(op):
+        start = time.perf_counter()
+        try:
+            op()
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, e
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for latency, error in pool.map(timed, [op for _ in range(args.iterations) for op in ops]):
+            if error is None:
+                latencies.append(latency)
+            else:
+                errors += 1
+                if not isinstance(error, fakes.FakeBackendError) and errors == 1:
+                    print(f"  {name}: {type(error).__name__}: {error}", file=sys.stderr)
+    wall = time.perf_counter() - start
+    backend_calls = backend.calls
+
+    # Peak memory comes from one untimed pass, as tracing slows every allocation.
+    tracemalloc.start()
+    with PeakRss() as rss, ThreadPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(timed, ops))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ms = [l * 1000 for l in latencies]
+    return {
+        "ops": len(latencies) + errors,
+        "errors": errors,
+        "wall_s": round(wall, 4),
+        "throughput_ops_s": round(len(latencies) / wall, 2) if wall else None,
+        "latency_ms": {
+            "mean": round(sum(ms) / len(ms), 3) if ms else None,
+            "p50": _round(percentile(ms, 50)),
+            "p90": _round(percentile(ms, 90)),
+            "p99": _round(percentile(ms, 99)),
+            "max": _round(max(ms) if ms else None),
+        },
+        "python_heap_peak_mb": round(peak / 2**20, 3),
+        "peak_rss_mb": round(rss.peak_mb, 1),
+        "rss_growth_mb": round(rss.peak_mb - rss.start_mb, 1),
+        "backend_calls": backend_calls,
+    }
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+def default_label():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def compare(current, baseline, threshold):
+    """Prints per-scenario deltas and returns the names of regressed scenarios."""
+    regressions = []
+    print(f"\nComparison with {baseline.get('label')} (threshold {threshold:.0%}):")
+    if baseline.get("config") != current["config"]:
+        print("  warning: runs used different settings, deltas are not like-for-like")
+    for name, result in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old or "skipped" in result or "skipped" in old:
+            continue
+        old_p50, new_p50 = old["latency_ms"]["p50"], result["latency_ms"]["p50"]
+        old_tp, new_tp = old["throughput_ops_s"], result["throughput_ops_s"]
+        if not (old_p50 and new_p50 and old_tp and new_tp):
+            continue
+        p50_change = new_p50 / old_p50 - 1
+        tp_change = new_tp / old_tp - 1
+        regressed = p50_change > threshold or tp_change < -threshold
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:22} p50 {p50_change:+7.1%}  throughput {tp_change:+7.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'scenario':22} {'ops':>5} {'err':>4} {'ops/s':>9} {'p50 ms':>9} {'p90 ms':>9} "
+          f"{'p99 ms':>9} {'heap MB':>8} {'RSS MB':>8} {'+RSS MB':>8}")
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"{name:22} skipped ({r['skipped']})")
+            continue
+        lat = r["latency_ms"]
+        print(f"{name:22} {r['ops']:5} {r['errors']:4} {r['throughput_ops_s'] or 0:9.1f} "
+              f"{lat['p50'] or 0:9.2f} {lat['p90'] or 0:9.2f} {lat['p99'] or 0:9.2f} "
+              f"{r['python_heap_peak_mb']:8.2f} {r['peak_rss_mb']:8.1f} {r['rss_growth_mb']:8.1f}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n")[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), help="scenarios to run")
+    parser.add_argument("--iterations", type=int, default=10, help="passes over each scenario's operations")
+    parser.add_argument("--workers", type=int, default=1, help="operations run concurrently")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake backend latency per call (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency per call (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probability a backend call fails")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default=None, help="result name (default: git short hash)")
+    parser.add_argument("--output", default=None, help="result JSON path")
+    parser.add_argument("--compare", default=None, help="baseline result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    label = args.label or default_label()
+    with open(os.path.join(CORPUS_DIR, "transcript.txt")) as f:
+        transcript = f.read()
+
+    results = {}
+    for name in args.only or SCENARIOS:
+        backend = fakes.Backend(args.latency, args.jitter, args.failure_rate, args.seed)
+        with fakes.install(backend, transcript):
+            results[name] = run_scenario(name, backend, args)
+
+    report = {
+        "label": label,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: getattr(args, k) for k in ("iterations", "workers", "latency", "jitter",
+                                                  "failure_rate", "seed")},
+        "scenarios": results,
+    }
+    print_table(results)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{label}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    status = 0
+    skipped = [name for name, r in results.items() if "skipped" in r]
+    if skipped:
+        print(f"\nSkipped scenario(s): {', '.join(skipped)}", file=sys.stderr)
+        status = 1
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,9 +16,10 @@ def main():
         {"name": "Illness Testing", "description": "Identifies any anomalies, diseases or any health issues by scanning the uploaded Image"},
         {"name": "Medical Prescription", "description": "Scans the Handwritten Medical prescrition and shows Medicine/dosage details in a table"},
         {"name": "Multi-modal Diagnosis", "description": "Generates a medical diagnosis based on the provided prompt and optional multimedia"},
-        {"name": "Translation Service", "description": "Accepts a file (PDF, Docx or an Image in English), translates the content into Hindi or Kannada"},
+        {"name": "Translation Service", "description": "Accepts files (PDF or Images in English), translates the content into Hindi, Kannada and other Indian languages"},
         {"name": "Youtube Summarizer", "description": "Lists the essence of a given YouTube video transcript into a concise summary"},
-        {"name": "Story Teller", "description": "This app creates a story based on your imagination"}
+        {"name": "Story Teller", "description": "This app creates a story based on your imagination"},
+        {"name": "Archive Search", "description": "Searches the documents and analyses already processed by the other apps"}
     ]
 
     cols = st.columns(4)
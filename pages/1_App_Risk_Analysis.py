@@ -1,16 +1,13 @@
 import streamlit as st
 from dotenv import load_dotenv
+import hashlib
 import os
 
 load_dotenv()
 
-import tempfile
-from PIL import Image
-import pytesseract
-import docx
-import PyPDF2
-from pdf2image import convert_from_path
 import google.generativeai as genai
+from services.risk_analysis import FILE_TYPES, extract_text, analyze_risks, ask_about_contract
+from services.archive import RISK_ANALYSIS, get_archive
 
 # Set up Gemini API
 API_KEY = os.getenv("GEMINI_API_KEY")
@@ -21,69 +18,60 @@ genai.configure(api_key=API_KEY)
 
 st.title('Contract Risk Analyzer (Gemini AI)')
 
-uploaded_file = st.file_uploader('Upload a legal document (PDF, DOCX, or image)', type=['pdf', 'docx', 'png', 'jpg', 'jpeg'])
-
-
-def extract_text_from_docx(file):
-    doc = docx.Document(file)
-    return '\n'.join([para.text for para in doc.paragraphs])
-
-def extract_text_from_pdf(file):
-    text = ''
-    try:
-        reader = PyPDF2.PdfReader(file)
-        for page in reader.pages:
-            text += page.extract_text() or ''
-    except Exception:
-        # fallback to OCR
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_pdf:
-            tmp_pdf.write(file.read())
-            tmp_pdf.flush()
-            images = convert_from_path(tmp_pdf.name)
-            for image in images:
-                text += pytesseract.image_to_string(image)
-        file.seek(0)
-    return text
-
-def extract_text_from_image(file):
-    image = Image.open(file)
-    return pytesseract.image_to_string(image)
-
-
-def extract_text(file, filetype):
-    if filetype == 'pdf':
-        return extract_text_from_pdf(file)
-    elif filetype == 'docx':
-        return extract_text_from_docx(file)
-    elif filetype in ['png', 'jpg', 'jpeg']:
-        return extract_text_from_image(file)
-    else:
-        return ''
-
-
-def analyze_risks_with_gemini(text):
-    prompt = (
-        "You are a legal expert. Read the following contract and list all potential risks, liabilities, or unfavorable terms for the party receiving the contract. "
-        "Present the risks as a numbered list with a brief explanation for each.\n\nContract Text:\n" + text
-    )
-    model = genai.GenerativeModel('gemini-flash-latest')
-    response = model.generate_content(prompt)
-    return response.text
+uploaded_file = st.file_uploader('Upload a legal document (PDF, DOCX, or image)', type=FILE_TYPES)
 
 if uploaded_file:
     filetype = uploaded_file.name.split('.')[-1].lower()
-    with st.spinner('Extracting text from document...'):
-        text = extract_text(uploaded_file, filetype)
+    # Keyed by content so a different file with the same name starts afresh,
+    # and follow-up questions don't re-run OCR on every rerun.
+    digest = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    if st.session_state.get('contract_for') != digest:
+        with st.spinner('Extracting text from document...'):
+            st.session_state['contract_text'] = extract_text(uploaded_file, filetype)
+        st.session_state['contract_for'] = digest
+        st.session_state.pop('risks', None)
+        st.session_state.pop('risks_unarchived', None)
+    text = st.session_state['contract_text']
     if not text.strip():
         st.error('No text could be extracted from the document.')
     else:
         st.subheader('Extracted Text (preview)')
         st.text_area('Text', text[:2000] + ('...' if len(text) > 2000 else ''), height=200)
+        try:
+            prior = get_archive().find_by_source(RISK_ANALYSIS, uploaded_file.getvalue())
+        except Exception as e:
+            prior = None
+            st.warning(f'The archive could not be searched: {e}')
+        if prior and 'risks' not in st.session_state:
+            st.info(f"This document was already analyzed on {prior['created_at']}. "
+                    "The archived result is shown below; analyze again to refresh it.")
+            st.subheader('Identified Risks (archived)')
+            st.markdown(prior['output'])
         if st.button('Analyze Risks with Gemini AI'):
             with st.spinner('Analyzing risks with Gemini AI...'):
                 try:
-                    risks = analyze_risks_with_gemini(text)
-                    st.subheader('Identified Risks')
-                    st.markdown(risks)
+                    st.session_state['risks'] = analyze_risks(text)
+                    st.session_state['risks_unarchived'] = True
                 except Exception as e:
-                    st.error(f'Error analyzing risks: {e}') 
+                    st.error(f'Error analyzing risks: {e}')
+        if 'risks' in st.session_state:
+            risks, metrics = st.session_state['risks']
+            st.subheader('Identified Risks')
+            st.markdown(risks)
+            st.caption(metrics.summary())
+            if st.session_state.pop('risks_unarchived', False):
+                try:
+                    get_archive().record(RISK_ANALYSIS, uploaded_file.name, source=uploaded_file.getvalue(),
+                                         text=text, output=risks)
+                except Exception as e:
+                    st.warning(f'The result could not be archived: {e}')
+
+            question = st.text_input('Ask a follow-up question about this contract')
+            if question:
+                with st.spinner('Asking Gemini AI...'):
+                    try:
+                        answer, metrics = ask_about_contract(text, question)
+                        st.markdown(answer)
+                        st.caption(metrics.summary())
+                    except Exception as e:
+                        st.error(f'Error answering question: {e}')
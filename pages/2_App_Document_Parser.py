@@ -4,8 +4,9 @@ import os
 
 load_dotenv()
 
-from llama_parse import LlamaParse
-import tempfile
+import hashlib
+from services.parsing import parse_files
+from services.archive import DOCUMENT_PARSER, get_archive
 
 # Set your LlamaParse API key (alternatively use st.secrets)
 if os.getenv("LLAMA_CLOUD_API_KEY"):
@@ -15,33 +16,58 @@ if os.getenv("LLAMA_CLOUD_API_KEY"):
 st.set_page_config(page_title="LlamaParse File Extractor", layout="centered")
 
 st.title("Data Extraction from PDF/DOCX/JPEG using LLama AI Model")
-st.markdown("Upload a PDF, DOCX, or JPG/JPEG file to extract and display its content.")
+st.markdown("Upload one or more PDF, DOCX, or JPG/JPEG files to extract and display their content.")
 
 # File uploader
-uploaded_file = st.file_uploader("Choose a file", type=["pdf", "docx", "jpg", "jpeg"])
+uploaded_files = st.file_uploader("Choose files", type=["pdf", "docx", "jpg", "jpeg"],
+                                  accept_multiple_files=True)
+workers = st.slider("Files parsed in parallel", min_value=1, max_value=16,
+                    value=int(os.getenv("LLAMA_PARSE_WORKERS", "4")))
 
-if uploaded_file:
-    file_type = uploaded_file.type
-    file_name = uploaded_file.name
+# Parsed results survive reruns (e.g. turning a page) so files are parsed once
+parsed = st.session_state.setdefault("parsed_files", {})
 
-    # Save the uploaded file to a temporary location
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_name.split('.')[-1]}") as tmp_file:
-        tmp_file.write(uploaded_file.read())
-        tmp_path = tmp_file.name
 
-    # Initialize LlamaParse
-    st.info("Parsing file using LlamaParse. Please wait...")
-    parser = LlamaParse(result_type="text", verbose=True)
+def show_result(key, result):
+    with st.expander(result.name, expanded=True):
+        if result.error:
+            st.error(f"❌ Failed to parse file: {result.error}")
+            return
+        st.success(f"✅ File successfully parsed! ({len(result.pages)} page(s))")
+        # Only the selected page is sent to the browser
+        page = 1
+        if len(result.pages) > 1:
+            page = st.number_input("Page", min_value=1, max_value=len(result.pages), value=1,
+                                   key=f"page_{key}")
+        st.text_area("Parsed Text", result.pages[page - 1] if result.pages else "", height=300,
+                     key=f"text_{key}_{page}")
+        st.download_button("Download full text", result.text,
+                           file_name=f"{os.path.splitext(result.name)[0]}.txt",
+                           mime="text/plain", key=f"download_{key}")
 
-    try:
-        documents = parser.load_data(tmp_path)
 
-        # Display the extracted content
-        st.success("✅ File successfully parsed!")
-        st.subheader("📃 Extracted Content:")
-        for doc in documents:
-            st.text_area("Parsed Text", doc.text, height=300)
+files = {hashlib.sha256(f.getvalue()).hexdigest(): f for f in uploaded_files or []}
+# Forget files that were removed from the uploader
+for key in set(parsed) - set(files):
+    del parsed[key]
 
-    except Exception as e:
-        st.error(f"❌ Failed to parse file: {e}")
+if files:
+    st.subheader("📃 Extracted Content:")
+    for key, f in files.items():
+        if key in parsed:
+            show_result(key, parsed[key])
 
+    todo = [(key, f) for key, f in files.items() if key not in parsed]
+    if todo:
+        progress = st.progress(0.0, text=f"Parsing {len(todo)} file(s) using LlamaParse. Please wait...")
+        for done, result in enumerate(parse_files([(f.name, f.getvalue()) for _, f in todo], workers), 1):
+            key, f = todo[result.index]
+            parsed[key] = result
+            progress.progress(done / len(todo), text=f"Parsed {done} of {len(todo)} file(s)")
+            show_result(key, result)
+            if not result.error:
+                try:
+                    get_archive().record(DOCUMENT_PARSER, result.name, source=f.getvalue(), text=result.text)
+                except Exception as e:
+                    st.warning(f"{result.name} could not be archived: {e}")
+        progress.empty()
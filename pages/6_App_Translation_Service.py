@@ -1,146 +1,113 @@
 import streamlit as st
 import os
-from PIL import Image
 import pytesseract
-from pdf2image import convert_from_path
-from docx import Document
-from io import BytesIO
-import requests
-import json
-from google.cloud import translate_v2 as translate
-from google.auth.api_key import Credentials
+from services.translation import (
+    LANGUAGES, DOCX_MIME, create_docx, create_zip, docx_name, translate_files,
+)
+from services.archive import TRANSLATION, get_archive, translations_output
 
 # Set Tesseract path (change this according to your system)
 #pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'  # Windows example
 # For Linux/Mac: pytesseract.pytesseract.tesseract_cmd = '/usr/bin/tesseract'
 pytesseract.pytesseract.tesseract_cmd = '/usr/bin/tesseract'
 
-# Set up Gemini API
+# Set up Google Translate API
 API_KEY = os.getenv("GOOGLE_TRANSLATION_API_KEY")
 if not API_KEY:
     st.error('GOOGLE_TRANSLATION_API_KEY environment variable not set.')
     st.stop()
 
+# Number of files OCR'd at the same time
+MAX_WORKERS = int(os.getenv("TRANSLATION_MAX_WORKERS", "4"))
+
+
+# Cached so that clicking a download button doesn't OCR and translate again.
+# The cache is shared by every session and keyed on the uploaded bytes, so it
+# is bounded to recent uploads rather than kept for the life of the server.
+@st.cache_data(show_spinner=False, max_entries=32, ttl="1h")
+def run_translation(files, languages):
+    return translate_files(list(files), list(languages), API_KEY, max_workers=MAX_WORKERS)
+
+
+def archive_results(files, results):
+    """Archives each translated file once, whether or not it came from the cache."""
+    archive = get_archive()
+    for (name, data), result in zip(files, results):
+        if not result.translations:
+            continue
+        output = translations_output(result.translations)
+        prior = archive.find_by_source(TRANSLATION, data)
+        if prior and prior['output'] == output:
+            continue
+        archive.record(TRANSLATION, name, source=data, text=result.original_text, output=output,
+                       metadata={"languages": list(result.translations)})
 
-# Function to extract text from image
-def image_to_text(image_path):
-    img = Image.open(image_path)
-    text = pytesseract.image_to_string(img)
-    return text
-
-# Function to extract text from PDF
-def pdf_to_text(pdf_path):
-    images = convert_from_path(pdf_path)
-    text = ""
-    for img in images:
-        text += pytesseract.image_to_string(img)
-    return text
-
-def translate_text(text, target_language):
-    """Translates text into the target language using an API key."""
-    translate_client = translate.Client(credentials=Credentials(API_KEY))
-
-    translation = translate_client.translate(
-        text,
-        target_language=target_language
-    )
-
-    return translation['translatedText']
-
-
-# Function to create and save DOCX
-def create_docx1(text, filename):
-    doc = Document()
-    doc.add_paragraph(text)
-    doc_bytes = BytesIO()
-    doc.save(doc_bytes)
-    doc_bytes.seek(0)
-    return doc_bytes
-
-def create_docx(text, filename):
-    # Sanitize text to be XML compatible
-    # Remove or replace problematic characters
-    sanitized_text = ""
-    for char in text:
-        # XML can't handle control characters except tab, newline, and carriage return
-        if ord(char) >= 32 or char in ['\t', '', '\r']:
-            sanitized_text += char
-        else:
-            # Replace control characters with a space or empty string
-            sanitized_text += " "
-    
-    # Create the document with sanitized text
-    doc = Document()
-    doc.add_paragraph(sanitized_text)
-    doc_bytes = BytesIO()
-    doc.save(doc_bytes)
-    doc_bytes.seek(0)
-    return doc_bytes
 
 # Streamlit app
 def main():
     st.title("Notice Translation App")
-    st.write("Upload a notice (PDF or image) to translate to Hindi or Kannada")
+    st.write("Upload one or more notices (PDF or image) to translate into one or more languages")
 
     # File upload
-    uploaded_file = st.file_uploader("Choose a file", type=['pdf', 'png', 'jpg', 'jpeg'])
+    uploaded_files = st.file_uploader("Choose files", type=['pdf', 'png', 'jpg', 'jpeg'],
+                                      accept_multiple_files=True)
 
     # Language selection
-    options = ["Hindi", "Kannada"]
-    selected_lang = st.selectbox("Choose your target language:", options, index=None)
-    st.write(f"You selected: {selected_lang}")
-
-    if selected_lang == "Hindi":
-        target_lang = "hi"
-    if selected_lang == "Kannada":
-        target_lang = "ka"
-   
-    if uploaded_file is not None:
-        # Save the uploaded file temporarily
-        file_ext = os.path.splitext(uploaded_file.name)[1].lower()
-        temp_file_path = f"temp{file_ext}"
-        with open(temp_file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-
-        try:
-            # Extract text based on file type
-            if file_ext == '.pdf':
-                extracted_text = pdf_to_text(temp_file_path)
-            else:
-                extracted_text = image_to_text(temp_file_path)
-
-            if extracted_text.strip():
-                st.subheader("Original Text")
-                st.text_area("Original Text", extracted_text, height=200, key="original")
-
-                # Translate text
-                with st.spinner('Translating...'):
-                    translated_text = translate_text(extracted_text, target_lang)
-
-                st.subheader("Translated Text")
-                st.text_area("Translated Text", translated_text, height=200, key="translated")
-
-                # Create download buttons
-                col1 = st.columns(1)[0]
-
-                with col1:
-                    # Download DOCX
-                    docx_file = create_docx(translated_text, "translated_notice.docx")
-                    st.download_button(
-                        label="Download as DOCX",
-                        data=docx_file,
-                        file_name="translated_notice.docx",
-                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                    )             
-            else:
+    selected_langs = st.multiselect("Choose your target languages:", list(LANGUAGES))
+
+    if not uploaded_files:
+        return
+    if not selected_langs:
+        st.info("Select at least one target language.")
+        return
+
+    files = tuple((f.name, f.getvalue()) for f in uploaded_files)
+    with st.spinner(f'Translating {len(files)} file(s) into {len(selected_langs)} language(s)...'):
+        results = run_translation(files, tuple(selected_langs))
+    if any(r.errors for r in results):
+        # Don't replay a transient OCR or Translate failure on later reruns.
+        run_translation.clear(files, tuple(selected_langs))
+        st.button("Retry failed files")
+
+    for i, result in enumerate(results):
+        with st.expander(result.name, expanded=len(results) == 1):
+            if "ocr" in result.errors:
+                st.error(f"An error occurred: {result.errors['ocr']}")
+                continue
+            if not result.original_text.strip():
                 st.warning("No text could be extracted from the file. Please try with a clearer image or PDF.")
-
-        except Exception as e:
-            st.error(f"An error occurred: {str(e)}")
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
+                continue
+
+            st.subheader("Original Text")
+            st.text_area("Original Text", result.original_text, height=200, key=f"original_{i}")
+
+            for language in selected_langs:
+                st.subheader(f"Translated Text ({language})")
+                if language in result.errors:
+                    st.error(f"An error occurred: {result.errors[language]}")
+                    continue
+                st.text_area("Translated Text", result.translations[language], height=200,
+                             key=f"translated_{i}_{language}")
+                st.download_button(
+                    label=f"Download {language} as DOCX",
+                    data=create_docx(result.translations[language]),
+                    file_name=docx_name(result, language),
+                    mime=DOCX_MIME,
+                    key=f"docx_{i}_{language}",
+                )
+
+    if sum(len(r.translations) for r in results) > 1:
+        st.download_button(
+            label="Download all as ZIP",
+            data=create_zip(results),
+            file_name="translated_notices.zip",
+            mime="application/zip",
+        )
+
+    try:
+        archive_results(files, results)
+    except Exception as e:
+        st.warning(f"The translations could not be archived: {e}")
 
 if __name__ == "__main__":
     main()
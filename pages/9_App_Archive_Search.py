@@ -0,0 +1,58 @@
+import streamlit as st
+from dotenv import load_dotenv
+import os
+import time
+
+load_dotenv()
+
+from services.archive import APPS, PRESCRIPTION, get_archive
+
+st.set_page_config(page_title="Archive Search", layout="wide")
+st.title("Archive Search 🔎")
+st.caption("Find documents and analyses that were already processed by the apps, instead of running them again.")
+
+archive = get_archive()
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    query = st.text_input("Search extracted text, file names and results:", placeholder="e.g. indemnify supplier")
+with col2:
+    app = st.selectbox("App", [None, *archive.apps()],
+                       format_func=lambda a: "All apps" if a is None else APPS.get(a, a))
+
+start = time.perf_counter()
+if query:
+    results = archive.search(query, app=app, limit=50)
+    st.caption(f"{len(results)} result(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+else:
+    results = archive.recent(app=app)
+    st.caption("Most recently archived")
+
+# Expanders render their contents even when collapsed, so documents and
+# original files are only loaded for the results the user asks to see.
+for result in results:
+    doc_id = result['id']
+    with st.expander(f"{result['name']} · {APPS.get(result['app'], result['app'])} · {result['created_at']}"):
+        if result.get('snippet'):
+            st.markdown(result['snippet'])
+        if not st.toggle("Show result and extracted text", key=f"details_{doc_id}"):
+            continue
+        doc = archive.get(doc_id)
+        if doc['output']:
+            st.subheader("Result")
+            if doc['app'] == PRESCRIPTION:
+                st.json(doc['output'])
+            else:
+                st.markdown(doc['output'])
+        if doc['text']:
+            st.subheader("Extracted text")
+            st.text_area("Extracted text", doc['text'][:5000] + ('...' if len(doc['text']) > 5000 else ''),
+                         height=200, key=f"text_{doc_id}")
+            st.download_button("Download full text", doc['text'], file_name=f"{os.path.splitext(doc['name'])[0]}.txt",
+                               mime="text/plain", key=f"download_text_{doc_id}")
+        if doc['source_sha256']:
+            if st.button("Prepare original file", key=f"prepare_source_{doc_id}"):
+                st.session_state[f"source_{doc_id}"] = True
+            if st.session_state.get(f"source_{doc_id}"):
+                st.download_button("Download original file", archive.get_blob(doc['source_sha256']),
+                                   file_name=doc['name'], key=f"download_source_{doc_id}")
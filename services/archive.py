@@ -0,0 +1,196 @@
+"""Local searchable archive of processed documents and model outputs.
+
+Extracted text and outputs (risk lists, prescription JSON, summaries, ...)
+are stored in SQLite with an FTS5 index, so prior analyses can be found in
+milliseconds instead of uploading and paying for the same document again.
+Uploaded source files are kept as zlib-compressed, content-addressed blobs
+(``blobs/ab/cdef...``), so the same document is only stored once.
+
+The archive lives in ``$ARCHIVE_DIR`` (default ``./archive``).
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timezone
+
+DEFAULT_DIR = os.path.join(".", "archive")
+
+# App ids used by both the pages and the CLI, so results from either are
+# found together.
+RISK_ANALYSIS = "risk_analysis"
+DOCUMENT_PARSER = "document_parser"
+ILLNESS_TESTING = "illness_testing"
+PRESCRIPTION = "prescription"
+DIAGNOSIS = "diagnosis"
+TRANSLATION = "translation"
+YOUTUBE_SUMMARIZER = "youtube_summarizer"
+STORY_TELLER = "story_teller"
+
+APPS = {
+    RISK_ANALYSIS: "Risk Analysis",
+    DOCUMENT_PARSER: "Document Parser",
+    ILLNESS_TESTING: "Illness Testing",
+    PRESCRIPTION: "Medical Prescription",
+    DIAGNOSIS: "Multi-modal Diagnosis",
+    TRANSLATION: "Translation Service",
+    YOUTUBE_SUMMARIZER: "YouTube Summarizer",
+    STORY_TELLER: "Story Teller",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    app TEXT NOT NULL,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    source_sha256 TEXT,
+    source_size INTEGER,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS documents_source ON documents (app, source_sha256);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5 (name, text, output);
+"""
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def fts_query(text):
+    """Turns free text into an FTS5 query: every word must match, the last as a prefix."""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def translations_output(translations):
+    """Archived output of the translation app: every language under a header."""
+    return "\n\n".join(f"[{language}]\n{text}" for language, text in translations.items())
+
+
+def archive_dir():
+    return os.getenv("ARCHIVE_DIR", DEFAULT_DIR)
+
+
+class Archive:
+    def __init__(self, root=None):
+        self.root = root = root or archive_dir()
+        self.blob_dir = os.path.join(root, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.db_path = os.path.join(root, "archive.db")
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # sqlite3 connections can't be shared across threads; keep one per thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _blob_path(self, sha):
+        return os.path.join(self.blob_dir, sha[:2], sha[2:])
+
+    def put_blob(self, data):
+        """Stores ``data`` compressed under its SHA-256 and returns the hash."""
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(data))
+            os.replace(tmp, path)
+        return sha
+
+    def get_blob(self, sha):
+        with open(self._blob_path(sha), "rb") as f:
+            return zlib.decompress(f.read())
+
+    def record(self, app, name, source=None, text="", output="", metadata=None):
+        """Archives one processed document and returns its id.
+
+        ``source`` is the uploaded file's bytes, ``output`` a string or any
+        JSON-serialisable value.
+        """
+        if not isinstance(output, str):
+            output = json.dumps(output, ensure_ascii=False, default=str)
+        sha = self.put_blob(source) if source is not None else None
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO documents (app, name, created_at, source_sha256, source_size, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (app, name, datetime.now(timezone.utc).isoformat(timespec="seconds"), sha,
+                 len(source) if source is not None else None,
+                 json.dumps(metadata, default=str) if metadata else None))
+            conn.execute("INSERT INTO documents_fts (rowid, name, text, output) VALUES (?, ?, ?, ?)",
+                         (cursor.lastrowid, name, text or "", output or ""))
+        return cursor.lastrowid
+
+    def find_by_source(self, app, source):
+        """The most recent archived result of ``app`` for identical source bytes, if any."""
+        sha = hashlib.sha256(source).hexdigest()
+        row = self._connect().execute(
+            "SELECT id FROM documents WHERE app = ? AND source_sha256 = ? ORDER BY id DESC LIMIT 1",
+            (app, sha)).fetchone()
+        return self.get(row["id"]) if row else None
+
+    def get(self, doc_id):
+        row = self._connect().execute(
+            "SELECT d.*, f.text, f.output FROM documents d JOIN documents_fts f ON f.rowid = d.id "
+            "WHERE d.id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return None
+        doc = dict(row)
+        doc["metadata"] = json.loads(doc["metadata"]) if doc["metadata"] else {}
+        return doc
+
+    def search(self, text, app=None, limit=20):
+        """Ranked matches for free-text ``text`` with highlighted snippets."""
+        query = fts_query(text)
+        if query is None:
+            return []
+        sql = ("SELECT d.id, d.app, d.name, d.created_at, d.source_sha256, "
+               "snippet(documents_fts, -1, '**', '**', ' … ', 16) AS snippet "
+               "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+               "WHERE documents_fts MATCH ?")
+        params = [query]
+        if app:
+            sql += " AND d.app = ?"
+            params.append(app)
+        sql += " ORDER BY bm25(documents_fts) LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    def recent(self, app=None, limit=20):
+        sql = "SELECT id, app, name, created_at, source_sha256 FROM documents"
+        params = []
+        if app:
+            sql += " WHERE app = ?"
+            params.append(app)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    def apps(self):
+        return [row[0] for row in self._connect().execute("SELECT DISTINCT app FROM documents ORDER BY app")]
+
+
+def get_archive(root=None):
+    """Process-wide ``Archive`` for ``root``, shared by every page and session."""
+    root = root or archive_dir()
+    with _archives_lock:
+        if root not in _archives:
+            _archives[root] = Archive(root)
+        return _archives[root]
@@ -0,0 +1,246 @@
+"""Command line runner for the app pipelines.
+
+    python -m services risk-analysis contracts/*.pdf --workers 8 --output risks.jsonl
+
+Directories are expanded to the files each app accepts, inputs are processed
+in parallel, and one JSON object per input is written as it completes.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from .archive import (
+    DIAGNOSIS, DOCUMENT_PARSER, ILLNESS_TESTING, PRESCRIPTION, RISK_ANALYSIS, STORY_TELLER,
+    TRANSLATION, YOUTUBE_SUMMARIZER, get_archive, translations_output,
+)
+
+
+def configure_gemini():
+    import google.generativeai as genai
+    if os.getenv("GEMINI_API_KEY"):
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+
+
+def expand_inputs(inputs, file_types):
+    """Expands directories and glob patterns into the files an app accepts.
+
+    Exits with an error for an input that matches no file, rather than
+    silently processing nothing.
+    """
+    extensions = {f".{t}" for t in file_types}
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = [os.path.join(root, name)
+                       for root, _, names in sorted(os.walk(item))
+                       for name in sorted(names)
+                       if os.path.splitext(name)[1].lower() in extensions]
+        elif glob.has_magic(item):
+            matches = sorted(glob.glob(item))
+        else:
+            matches = [item] if os.path.exists(item) else []
+        if not matches:
+            raise SystemExit(f"No input files match {item!r}.")
+        yield from matches
+
+
+def run_parallel(handler, items, workers):
+    """Runs ``handler`` on each item in a bounded pool, yielding records as they finish."""
+    def run(item):
+        start = time.perf_counter()
+        try:
+            record = {"input": item, **handler(item)}
+        except Exception as e:
+            record = {"input": item, "error": str(e)}
+        record["elapsed"] = round(time.perf_counter() - start, 3)
+        return record
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(run, item) for item in items]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def risk_analysis(args):
+    from . import risk_analysis
+    configure_gemini()
+    files = expand_inputs(args.inputs, risk_analysis.FILE_TYPES)
+    return run_parallel(risk_analysis.analyze_file, files, args.workers)
+
+
+def illness_testing(args):
+    from . import illness_testing
+    configure_gemini()
+    files = expand_inputs(args.inputs, illness_testing.FILE_TYPES)
+    return run_parallel(illness_testing.analyze_file, files, args.workers)
+
+
+def prescription(args):
+    from . import prescription
+    configure_gemini()
+    files = expand_inputs(args.inputs, prescription.FILE_TYPES)
+    return run_parallel(prescription.analyze_file, files, args.workers)
+
+
+def diagnosis(args):
+    from . import diagnosis
+    configure_gemini()
+    files = list(expand_inputs(args.inputs, ["png", "jpg", "jpeg"])) or [None]
+    return run_parallel(lambda path: diagnosis.diagnose(args.symptoms, path), files, args.workers)
+
+
+def summarize(args):
+    from . import summarizer
+    configure_gemini()
+    return run_parallel(summarizer.summarize_video, args.inputs, args.workers)
+
+
+def story(args):
+    from . import storyteller
+    return run_parallel(lambda prompt: {"story": storyteller.generate_story(prompt)},
+                        args.inputs or [""], args.workers)
+
+
+def parse(args):
+    from .parsing import parse_files
+    paths = list(expand_inputs(args.inputs, ["pdf", "docx", "jpg", "jpeg"]))
+    files = []
+    for path in paths:
+        with open(path, "rb") as f:
+            files.append((os.path.basename(path), f.read()))
+    for result in parse_files(files, args.workers):
+        record = {"input": paths[result.index], "pages": result.pages}
+        if result.error:
+            record["error"] = result.error
+        yield record
+
+
+def translate(args):
+    from .translation import LANGUAGES, create_docx, translate_files, unique_docx_name
+    codes = {code: name for name, code in LANGUAGES.items()}
+    languages = [codes.get(l, l.title()) for l in args.languages]
+    unknown = [l for l in languages if l not in LANGUAGES]
+    if unknown:
+        raise SystemExit(f"Unknown language(s): {', '.join(unknown)}")
+    api_key = os.getenv("GOOGLE_TRANSLATION_API_KEY")
+    if not api_key:
+        raise SystemExit("GOOGLE_TRANSLATION_API_KEY environment variable not set.")
+
+    paths = list(expand_inputs(args.inputs, ["pdf", "png", "jpg", "jpeg"]))
+    files = []
+    for path in paths:
+        with open(path, "rb") as f:
+            files.append((os.path.basename(path), f.read()))
+    results = translate_files(files, languages, api_key, max_workers=args.workers)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    used = set()
+    for path, result in zip(paths, results):
+        record = {"input": path, "original_text": result.original_text,
+                  "translations": result.translations}
+        if result.errors:
+            # Any failed language fails the record (and the exit status).
+            record["errors"] = result.errors
+            record["error"] = "; ".join(f"{k}: {v}" for k, v in result.errors.items())
+        elif not result.original_text.strip():
+            record["error"] = "No text could be extracted from the file."
+        if args.output_dir:
+            record["docx"] = []
+            for language, text in result.translations.items():
+                out = os.path.join(args.output_dir, unique_docx_name(result, language, used))
+                with open(out, "wb") as f:
+                    f.write(create_docx(text).getvalue())
+                record["docx"].append(out)
+        yield record
+
+
+def archive_record(archive, args, record):
+    """Archives a CLI record under the same app id, name and shape as its page does."""
+    app = args.archive_app
+    item = record["input"]
+    source = None
+    if item is not None and os.path.isfile(item):
+        with open(item, "rb") as f:
+            source = f.read()
+    name = os.path.basename(item) if source is not None else item
+    text, output, metadata = "", "", None
+    if app == RISK_ANALYSIS:
+        text, output = record["text"], record["risks"]
+    elif app == DOCUMENT_PARSER:
+        text = "\n\n".join(record["pages"])
+    elif app == ILLNESS_TESTING:
+        output = record["analysis"]
+    elif app == PRESCRIPTION:
+        output = record["prescription"]
+    elif app == DIAGNOSIS:
+        name = name or args.symptoms[:60]
+        text, output = args.symptoms, record["diagnosis"]
+    elif app == TRANSLATION:
+        text, output = record["original_text"], translations_output(record["translations"])
+        metadata = {"languages": list(record["translations"])}
+    elif app == YOUTUBE_SUMMARIZER:
+        text, output = record["transcript"], record["summary"]
+        metadata = {"video_id": record["video_id"]}
+    elif app == STORY_TELLER:
+        name = item or "Untitled story"
+        text, output = item, record["story"]
+    archive.record(app, name, source=source, text=text, output=output, metadata=metadata)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m services",
+                                     description="Run the AI app pipelines without Streamlit.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--workers", type=int, default=4, help="inputs processed in parallel")
+    common.add_argument("--output", "-o", default="-", help="JSONL output file (default: stdout)")
+    common.add_argument("--archive", action="store_true",
+                        help="also store each result in the searchable archive ($ARCHIVE_DIR)")
+    sub = parser.add_subparsers(dest="app", required=True)
+
+    def add(name, handler, archive_app, inputs_help, nargs="+"):
+        p = sub.add_parser(name, parents=[common])
+        p.add_argument("inputs", nargs=nargs, help=inputs_help)
+        p.set_defaults(handler=handler, archive_app=archive_app)
+        return p
+
+    add("risk-analysis", risk_analysis, RISK_ANALYSIS,
+        "contract files or directories (PDF, DOCX, images)")
+    add("parse", parse, DOCUMENT_PARSER, "files or directories for LlamaParse (PDF, DOCX, JPEG)")
+    add("illness-testing", illness_testing, ILLNESS_TESTING, "medical images or directories")
+    add("prescription", prescription, PRESCRIPTION, "prescription images or directories")
+    p = add("diagnosis", diagnosis, DIAGNOSIS, "optional medical images or directories", nargs="*")
+    p.add_argument("--symptoms", required=True, help="symptoms and medical history")
+    p = add("translate", translate, TRANSLATION, "notices (PDF or images) or directories")
+    p.add_argument("--languages", "-l", nargs="+", required=True,
+                   help="target languages by name or code, e.g. Hindi kn")
+    p.add_argument("--output-dir", help="write one DOCX per file and language here")
+    add("summarize", summarize, YOUTUBE_SUMMARIZER, "YouTube video URLs or ids")
+    add("story", story, STORY_TELLER, "story themes (one story each)", nargs="*")
+    return parser
+
+
+def main(argv=None):
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    archive = None
+    if args.archive:
+        archive = get_archive()
+    failed = 0
+    try:
+        for record in args.handler(args):
+            failed += "error" in record
+            if archive is not None and "error" not in record:
+                archive_record(archive, args, record)
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failed else 0
@@ -0,0 +1,83 @@
+"""Multi-modal medical diagnosis with Gemini."""
+import io
+
+import google.generativeai as genai
+from PIL import Image
+
+MODEL_NAME = 'gemini-1.5-flash'  # Using vision model for potential frame analysis
+
+DISCLAIMER = ("Disclaimer: This is an AI-powered tool for informational purposes only and should not be "
+              "considered a substitute for professional medical advice. Always consult with a qualified "
+              "healthcare provider for any health concerns.")
+
+_model = None
+
+
+def get_model():
+    global _model
+    if _model is None:
+        _model = genai.GenerativeModel(MODEL_NAME)
+    return _model
+
+
+def build_prompt(symptoms, image=False, audio=False, video=False):
+    prompt = f"Based on the following symptoms and medical history: {symptoms}. "
+    if image:
+        prompt += "Analyze the following medical image."
+    if audio:
+        prompt += "Analyze the provided audio recording for any relevant medical information."
+    if video:
+        prompt += "Analyze the provided video for any relevant medical information."
+    prompt += " Provide a potential diagnosis and recommendations."
+    return prompt
+
+
+def generate_diagnosis(prompt, image=None, audio=None, video=None):
+    """
+    Generates a medical diagnosis based on the provided prompt and optional multimedia.
+
+    Raises ``ValueError`` if the image can't be read.
+    """
+    content_parts = [prompt]
+
+    if image:
+        try:
+            img_bytes = image.read()
+            img = Image.open(io.BytesIO(img_bytes))
+            content_parts.append(img)
+        except Exception as e:
+            raise ValueError(f"Error reading the uploaded image: {e}") from e
+
+    if audio:
+        audio_bytes = audio.read()
+        # Gemini Pro Vision might not directly process audio.
+        # You would likely need to transcribe or analyze audio features separately
+        # and include the results in the prompt.
+        # For this example, we'll just indicate its presence in the prompt.
+        prompt += "\nUser has also provided an audio file for analysis."
+        # In a real application, you would use a dedicated audio processing model
+        # to extract relevant information (e.g., speech patterns, cough sounds)
+        # and incorporate that into the prompt.
+
+    if video:
+        video_bytes = video.read()
+        # Gemini Pro Vision can analyze video frames. You would need to decide
+        # how to best represent the video content (e.g., analyze key frames,
+        # extract motion patterns).
+        # For this example, we'll just indicate its presence in the prompt.
+        prompt += "\nUser has also provided a video file for analysis."
+        # In a real application, you would use a video processing library
+        # to extract relevant frames or features and then potentially pass
+        # those frames to Gemini Pro Vision or analyze them separately.
+
+    response = get_model().generate_content(content_parts)
+    return response.text if hasattr(response, 'text') else "No response from the model."
+
+
+def diagnose(symptoms, image_path=None):
+    """Diagnoses from symptoms and an optional image on disk, as a JSON-ready dict."""
+    prompt = build_prompt(symptoms, image=image_path is not None)
+    if image_path is None:
+        return {"diagnosis": generate_diagnosis(prompt)}
+    with open(image_path, 'rb') as image:
+        return {"diagnosis": generate_diagnosis(prompt, image)}
@@ -0,0 +1,304 @@
+"""Gemini system instructions and explicit context caching shared by the apps.
+
+Fixed instruction blocks (and large documents that are questioned repeatedly,
+such as a contract) are uploaded once as cached content with a TTL and then
+referenced by handle.  Blocks that are too small for the API to cache are
+still sent as a system instruction, so callers never need to branch on it.
+
+A cache is only created once a prefix is used a second time, so one-shot
+calls (e.g. a batch of risk analyses) never pay for a cache nothing reads.
+The first, uncached call of each prompt is kept as its baseline: when the
+same prompt is later served from the cache, the latency saved is reported,
+and the one-off cost of creating the cache is subtracted from the total.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+DEFAULT_TTL = timedelta(minutes=int(os.getenv("GEMINI_CACHE_TTL_MINUTES", "30")))
+# The API rejects explicit caches below a model-specific minimum size, so we
+# don't spend a request trying when the prefix is clearly too small.
+MIN_CACHE_TOKENS = int(os.getenv("GEMINI_MIN_CACHE_TOKENS", "1024"))
+# Refresh a little before the server-side expiry to avoid racing it.
+_EXPIRY_MARGIN = 30
+# Uncached latencies kept per prefix, one per distinct prompt.
+_MAX_BASELINES = 64
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_handles = {}  # key -> (CachedContent or None, expires_at)
+_stats = {}  # key -> CacheStats, dropped once unused for a TTL
+_creating = {}  # key -> lock held while that prefix's cache is created
+
+
+@dataclass
+class CallMetrics:
+    """Token and latency figures for one generate_content call."""
+    latency: float
+    prompt_tokens: int
+    cached_tokens: int
+    cached: bool
+    latency_saved: float | None = None  # vs the same prompt sent uncached
+    creation_latency: float = 0.0  # cache creation paid by this call, if any
+    net_latency_saved: float | None = None  # running total for the prefix
+
+    @property
+    def tokens_saved(self):
+        return self.cached_tokens
+
+    def summary(self):
+        mode = "cached prefix" if self.cached else "uncached"
+        text = (f"{mode}: {self.latency:.2f}s, {self.prompt_tokens} input tokens, "
+                f"{self.tokens_saved} served from cache")
+        if self.creation_latency:
+            text += f", cache created in {self.creation_latency:.2f}s"
+        if self.latency_saved is not None:
+            text += f", {self.latency_saved:+.2f}s saved vs the same prompt uncached"
+        if self.net_latency_saved is not None:
+            text += f" ({self.net_latency_saved:+.2f}s net for this prefix)"
+        return text
+
+
+@dataclass
+class CacheStats:
+    """Running totals per cached prefix, used as the baseline for savings."""
+    cached_calls: int = 0
+    cached_latency: float = 0.0
+    uncached_calls: int = 0
+    uncached_latency: float = 0.0
+    tokens_saved: int = 0
+    latency_saved: float = 0.0
+    creations: int = 0
+    creation_latency: float = 0.0
+    baselines: dict = field(default_factory=dict)  # prompt digest -> uncached latency
+    expires_at: float = 0.0
+
+    @property
+    def mean_uncached_latency(self):
+        return self.uncached_latency / self.uncached_calls if self.uncached_calls else None
+
+    @property
+    def mean_cached_latency(self):
+        return self.cached_latency / self.cached_calls if self.cached_calls else None
+
+    @property
+    def net_latency_saved(self):
+        """Latency saved by cached calls minus the time spent creating caches."""
+        return self.latency_saved - self.creation_latency
+
+
+def _key(model_name, system_instruction, contents):
+    digest = hashlib.sha256()
+    for part in (model_name, system_instruction, *contents):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _prompt_digest(parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            digest.update(part.encode("utf-8"))
+        elif isinstance(part, dict) and isinstance(part.get("data"), bytes):
+            digest.update(part["data"])
+        elif hasattr(part, "tobytes"):  # PIL image
+            digest.update(part.tobytes())
+        else:
+            digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _estimate_tokens(parts):
+    # Roughly four characters per token for English text.
+    return sum(len(p) for p in parts) // 4
+
+
+def _evict(now):
+    """Drops expired handles and statistics; call with ``_lock`` held."""
+    for key in [k for k, (_, expires_at) in _handles.items() if expires_at <= now]:
+        del _handles[key]
+    for key in [k for k, stats in _stats.items() if stats.expires_at <= now]:
+        del _stats[key]
+
+
+def _cached_handle(key, now):
+    with _lock:
+        entry = _handles.get(key)
+        if entry and entry[1] > now:
+            return True, entry[0]
+    return False, None
+
+
+def _get_cache(key, model_name, system_instruction, contents, ttl):
+    """Returns ``(handle or None, seconds spent creating it on this call)``.
+
+    Only one caller creates a given prefix's cache; concurrent callers wait
+    for it and then share the handle.
+    """
+    found, handle = _cached_handle(key, time.time())
+    if found:
+        return handle, 0.0
+    if _estimate_tokens([system_instruction, *contents]) < MIN_CACHE_TOKENS:
+        return None, 0.0
+
+    with _lock:
+        creating = _creating.setdefault(key, threading.Lock())
+    with creating:
+        found, handle = _cached_handle(key, time.time())
+        if found:
+            return handle, 0.0
+        start = time.perf_counter()
+        try:
+            from google.generativeai import caching
+            handle = caching.CachedContent.create(
+                model=model_name,
+                display_name=f"app-prefix-{key[:12]}",
+                system_instruction=system_instruction,
+                contents=list(contents) or None,
+                ttl=ttl,
+            )
+        except (google_exceptions.InvalidArgument, google_exceptions.FailedPrecondition):
+            # Unsupported model or prefix below the minimum: remember that and
+            # fall back to a plain system instruction until the TTL runs out.
+            handle = None
+        except Exception as e:
+            # Rate limits, server errors and network blips are transient; send
+            # this call uncached and try to create the cache again next time.
+            logger.warning("Gemini cache creation failed, retrying on next call: %s", e)
+            with _lock:
+                _creating.pop(key, None)
+            return None, 0.0
+        creation_latency = time.perf_counter() - start if handle is not None else 0.0
+
+        now = time.time()
+        with _lock:
+            _handles[key] = (handle, now + ttl.total_seconds() - _EXPIRY_MARGIN)
+            _creating.pop(key, None)
+            if handle is not None:
+                stats = _stats.setdefault(key, CacheStats())
+                stats.creations += 1
+                stats.creation_latency += creation_latency
+    return handle, creation_latency
+
+
+def _invalidate(key):
+    with _lock:
+        _handles.pop(key, None)
+
+
+def get_stats(key):
+    with _lock:
+        return _stats.setdefault(key, CacheStats())
+
+
+def _is_reused(key):
+    """True once a prefix has been sent before, i.e. a cache would be read."""
+    with _lock:
+        stats = _stats.get(key)
+        return stats is not None and stats.uncached_calls + stats.cached_calls > 0
+
+
+def _record(key, prompt, latency, usage, cached, ttl, creation_latency=0.0):
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+    cached_tokens = getattr(usage, "cached_content_token_count", 0) or 0
+    now = time.time()
+    with _lock:
+        _evict(now)
+        stats = _stats.setdefault(key, CacheStats())
+        stats.expires_at = now + ttl.total_seconds()
+        saved = None
+        if cached:
+            baseline = stats.baselines.get(prompt)
+            saved = baseline - latency if baseline is not None else None
+            stats.cached_calls += 1
+            stats.cached_latency += latency
+            stats.latency_saved += saved or 0.0
+        else:
+            stats.uncached_calls += 1
+            stats.uncached_latency += latency
+            if prompt not in stats.baselines and len(stats.baselines) < _MAX_BASELINES:
+                stats.baselines[prompt] = latency
+        stats.tokens_saved += cached_tokens
+        net = stats.net_latency_saved if stats.creations else None
+    return CallMetrics(latency, prompt_tokens, cached_tokens, cached, saved,
+                       creation_latency, net)
+
+
+class CachedModel:
+    """A GenerativeModel bound to a fixed instruction block and optional documents.
+
+    ``contents`` are large reusable documents (e.g. contract text) that become
+    part of the cached prefix; each call then only sends the new question.
+    The metrics of the most recent call are available as ``last_call``.
+    """
+
+    def __init__(self, model_name, system_instruction, contents=(), ttl=DEFAULT_TTL,
+                 generation_config=None, safety_settings=None):
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.contents = list(contents)
+        self.ttl = ttl
+        self.generation_config = generation_config
+        self.safety_settings = safety_settings
+        self.key = _key(model_name, system_instruction, self.contents)
+        self.last_call = None
+
+    def _uncached_model(self):
+        return genai.GenerativeModel(self.model_name,
+                                     system_instruction=self.system_instruction,
+                                     generation_config=self.generation_config,
+                                     safety_settings=self.safety_settings)
+
+    def _generate(self, model, parts, prompt, cached, creation_latency=0.0, **kwargs):
+        start = time.perf_counter()
+        response = model.generate_content(parts, **kwargs)
+        latency = time.perf_counter() - start
+        metrics = _record(self.key, prompt, latency, getattr(response, "usage_metadata", None),
+                          cached, self.ttl, creation_latency)
+        self.last_call = metrics
+        return response, metrics
+
+    def generate_with_metrics(self, parts, **kwargs):
+        """Like ``generate_content`` but also returns this call's ``CallMetrics``.
+
+        Prefer this when one instance is shared between threads, where
+        ``last_call`` may already belong to another request.
+        """
+        if not isinstance(parts, list):
+            parts = [parts]
+        prompt = _prompt_digest(parts)
+        creation_latency = 0.0
+        if _is_reused(self.key):
+            handle, creation_latency = _get_cache(self.key, self.model_name, self.system_instruction,
+                                                  self.contents, self.ttl)
+            if handle is not None:
+                model = genai.GenerativeModel.from_cached_content(
+                    cached_content=handle,
+                    generation_config=self.generation_config,
+                    safety_settings=self.safety_settings,
+                )
+                try:
+                    return self._generate(model, parts, prompt, True, creation_latency, **kwargs)
+                except (google_exceptions.NotFound, google_exceptions.PermissionDenied):
+                    # The cache expired or was evicted server-side; resend in full.
+                    _invalidate(self.key)
+        # First use of a prefix: sent in full, no cache is created for it.
+        return self._generate(self._uncached_model(), [*self.contents, *parts], prompt, False,
+                              creation_latency, **kwargs)
+
+    def generate_content(self, parts, **kwargs):
+        return self.generate_with_metrics(parts, **kwargs)[0]
+
+    @property
+    def stats(self):
+        return get_stats(self.key)
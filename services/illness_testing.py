@@ -0,0 +1,92 @@
+"""Medical image analysis with Gemini vision."""
+import mimetypes
+from dataclasses import asdict
+
+from .gemini_cache import CachedModel
+
+MODEL_NAME = "gemini-1.5-flash-latest"
+FILE_TYPES = ['png', 'jpg', 'jpeg']
+
+# https://aistudio.google.com/app/u/1/prompts/recipe-creator
+# Set up the model
+generation_config = {
+  "temperature": 1,
+  "top_p": 0.95,
+  "top_k": 0,
+  "max_output_tokens": 8192,
+}
+
+safety_settings = [
+  {
+    "category": "HARM_CATEGORY_HARASSMENT",
+    "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+  },
+  {
+    "category": "HARM_CATEGORY_HATE_SPEECH",
+    "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+  },
+  {
+    "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+    "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+  },
+  {
+    "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+    "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+  },
+]
+
+system_prompts = [
+    """
+    You are a domain expert in medical image analysis. You are tasked with 
+    examining medical images for a renowned hospital.
+    Your expertise will help in identifying or 
+    discovering any anomalies, diseases, conditions or
+    any health issues that might be present in the image.
+    
+    Your key responsibilites:
+    1. Detailed Analysis : Scrutinize and thoroughly examine each image, 
+    focusing on finding any abnormalities.
+    2. Analysis Report : Document all the findings and 
+    clearly articulate them in a structured format.
+    3. Recommendations : Basis the analysis, suggest remedies, 
+    tests or treatments as applicable.
+    4. Treatments : If applicable, lay out detailed treatments 
+    which can help in faster recovery.
+    
+    Important Notes to remember:
+    1. Scope of response : Only respond if the image pertains to 
+    human health issues.
+    2. Clarity of image : In case the image is unclear, 
+    note that certain aspects are 
+    'Unable to be correctly determined based on the uploaded image'
+    3. Disclaimer : Accompany your analysis with the disclaimer: 
+    "Consult with a Doctor before making any decisions."
+    4. Your insights are invaluable in guiding clinical decisions. 
+    Please proceed with the analysis, adhering to the 
+    structured approach outlined above.
+    
+    Please provide the final response with these 4 headings : 
+    Detailed Analysis, Analysis Report, Recommendations and Treatments
+    
+"""
+]
+
+# The instruction block is fixed, so it is sent once as a (cached) system
+# instruction instead of being repeated alongside every image.
+model = CachedModel(model_name=MODEL_NAME,
+                    system_instruction=system_prompts[0],
+                    generation_config=generation_config,
+                    safety_settings=safety_settings)
+
+
+def analyze_image(image_data, mime_type="image/jpg"):
+    """Returns the analysis text and the call's ``CallMetrics``."""
+    response, metrics = model.generate_with_metrics([{"mime_type": mime_type, "data": image_data}])
+    return response.text, metrics
+
+
+def analyze_file(path):
+    with open(path, 'rb') as f:
+        image_data = f.read()
+    analysis, metrics = analyze_image(image_data, mimetypes.guess_type(path)[0] or "image/jpg")
+    return {"analysis": analysis, "metrics": asdict(metrics)}
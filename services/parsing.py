@@ -0,0 +1,79 @@
+"""Concurrent LlamaParse ingestion.
+
+Files are parsed with LlamaParse's async API, at most ``workers`` at a time,
+and results are yielded as each file completes so the UI can render them
+incrementally.  Every temp file is removed whether parsing succeeds or not.
+"""
+import asyncio
+import os
+import tempfile
+from dataclasses import dataclass, field
+
+# Long single-page outputs (e.g. DOCX) are split so no page floods the UI.
+PAGE_CHARS = 5000
+
+
+@dataclass
+class ParsedFile:
+    """Parsed pages (or the error) for one input file."""
+    name: str
+    pages: list = field(default_factory=list)
+    error: str = None
+    index: int = None  # position in the input list
+
+    @property
+    def text(self):
+        return "\n\n".join(self.pages)
+
+
+def paginate(texts, page_chars=PAGE_CHARS):
+    pages = []
+    for text in texts:
+        pages.extend(text[i:i + page_chars] for i in range(0, max(len(text), 1), page_chars))
+    return pages
+
+
+def make_parser(result_type="text"):
+    from llama_parse import LlamaParse
+    return LlamaParse(result_type=result_type, verbose=False)
+
+
+async def aparse_file(parser, name, data, semaphore, index=None):
+    async with semaphore:
+        suffix = os.path.splitext(name)[1]
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+            tmp_file.write(data)
+            tmp_path = tmp_file.name
+        try:
+            documents = await parser.aload_data(tmp_path)
+            return ParsedFile(name, paginate(doc.text for doc in documents), index=index)
+        except Exception as e:
+            return ParsedFile(name, error=str(e), index=index)
+        finally:
+            os.remove(tmp_path)
+
+
+async def _cancel_pending():
+    pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+def parse_files(files, workers=4, parser=None):
+    """Parses ``(name, bytes)`` files concurrently, yielding each ``ParsedFile`` as it completes."""
+    parser = parser or make_parser()
+    loop = asyncio.new_event_loop()
+    try:
+        semaphore = asyncio.Semaphore(max(1, workers))
+        pending = {loop.create_task(aparse_file(parser, name, data, semaphore, index))
+                   for index, (name, data) in enumerate(files)}
+        while pending:
+            done, pending = loop.run_until_complete(
+                asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+            for task in done:
+                yield task.result()
+    finally:
+        # Let cancelled tasks run their finally blocks so temp files are removed.
+        loop.run_until_complete(_cancel_pending())
+        loop.close()
@@ -0,0 +1,103 @@
+"""Handwritten prescription parsing with Gemini and a LangChain JSON output parser."""
+from __future__ import annotations
+import base64
+from dataclasses import asdict
+from typing import List
+from datetime import datetime
+from langchain.chains import TransformChain
+from langchain_core.pydantic_v1 import BaseModel, Field
+from langchain_core.output_parsers import JsonOutputParser
+
+from .gemini_cache import CachedModel
+
+FILE_TYPES = ["png", "jpg", "jpeg"]
+
+
+class MedicationItem(BaseModel):
+    name: str
+    dosage: str
+    frequency: str
+    duration: str
+
+class PrescriptionInformations(BaseModel):
+    patient_name: str = Field(description="Patient's name")
+    patient_age: int = Field(description="Patient's age")
+    patient_gender: str = Field(description="Patient's gender")
+    doctor_name: str = Field(description="Doctor's name")
+    doctor_license: str = Field(description="Doctor's license number")
+    prescription_date: datetime = Field(description="Date of the prescription")
+    medications: List[MedicationItem] = []
+    additional_notes: str = Field(description="Additional notes or instructions")
+
+def load_images(inputs: dict) -> dict:
+    image_paths = inputs["image_paths"]
+    def encode_image(image_path):
+        with open(image_path, "rb") as image_file:
+            return base64.b64encode(image_file.read()).decode('utf-8')
+    images_base64 = [encode_image(image_path) for image_path in image_paths]
+    return {"images": images_base64}
+
+load_images_chain = TransformChain(
+    input_variables=["image_paths"],
+    output_variables=["images"],
+    transform=load_images
+)
+
+PRESCRIPTION_INSTRUCTIONS = """
+    You are an expert medical transcriptionist specializing in deciphering and accurately transcribing handwritten medical prescriptions.
+
+    Extract and return the following details from the provided prescription:
+    1. Patient's full name
+    2. Patient's age (handle different formats like "42y", "42yrs", "42", "42 years")
+    3. Patient's gender
+    4. Doctor's full name
+    5. Doctor's license number
+    6. Prescription date (in YYYY-MM-DD format)
+    7. List of medications including:
+       - Medication name
+       - Dosage
+       - Frequency
+       - Duration
+    8. Additional notes or instructions (as bullet points, clearly structured)
+
+    Return the response as structured JSON with matching keys.
+    """
+
+# Fixed instructions are sent once as a (cached) system instruction; each call
+# only carries the prescription images.
+prescription_model = CachedModel('gemini-1.5-flash', PRESCRIPTION_INSTRUCTIONS,
+                                 generation_config={"temperature": 0.4})
+
+def image_model(inputs: dict):
+    """Returns the model's text and the call's ``CallMetrics``."""
+    images_base64 = inputs['images']
+
+    image_parts = [
+        {"mime_type": "image/png", "data": base64.b64decode(img_b64)}
+        for img_b64 in images_base64
+    ]
+
+    # The model is shared by every session, so take this call's metrics
+    # rather than ``last_call``.
+    response, metrics = prescription_model.generate_with_metrics(image_parts)
+
+    return response.text, metrics
+
+def get_prescription_informations(image_paths: List[str]):
+    """Returns the parsed prescription and the call's ``CallMetrics``."""
+    parser = JsonOutputParser(pydantic_object=PrescriptionInformations)
+    images = load_images_chain.invoke({'image_paths': image_paths})
+    text, metrics = image_model(images)
+    return parser.parse(text), metrics
+
+def normalize_medications(medications: list) -> list:
+    # Normalize each dict if nested under a single key
+    if medications and isinstance(medications[0], dict) and all(len(m) == 1 for m in medications):
+        return [list(m.values())[0] for m in medications]
+    return medications
+
+def analyze_file(path: str) -> dict:
+    result, metrics = get_prescription_informations([path])
+    if result.get('medications'):
+        result['medications'] = normalize_medications(result['medications'])
+    return {"prescription": result, "metrics": asdict(metrics)}
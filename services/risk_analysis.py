@@ -0,0 +1,95 @@
+"""Contract risk analysis: text extraction plus Gemini risk listing and follow-up Q&A."""
+import os
+import tempfile
+from dataclasses import asdict
+
+import docx
+import PyPDF2
+import pytesseract
+from PIL import Image
+from pdf2image import convert_from_path
+
+from .gemini_cache import CachedModel
+
+MODEL_NAME = 'gemini-flash-latest'
+FILE_TYPES = ['pdf', 'docx', 'png', 'jpg', 'jpeg']
+
+LEGAL_EXPERT_INSTRUCTIONS = (
+    "You are a legal expert. Read the following contract and answer questions about it "
+    "from the point of view of the party receiving the contract."
+)
+
+RISKS_PROMPT = (
+    "List all potential risks, liabilities, or unfavorable terms for the party receiving the contract. "
+    "Present the risks as a numbered list with a brief explanation for each."
+)
+
+
+def extract_text_from_docx(file):
+    doc = docx.Document(file)
+    return '\n'.join([para.text for para in doc.paragraphs])
+
+
+def extract_text_from_pdf(file):
+    text = ''
+    try:
+        reader = PyPDF2.PdfReader(file)
+        for page in reader.pages:
+            text += page.extract_text() or ''
+    except Exception:
+        # fallback to OCR
+        file.seek(0)
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_pdf:
+            tmp_pdf.write(file.read())
+        try:
+            for image in convert_from_path(tmp_pdf.name):
+                text += pytesseract.image_to_string(image)
+        finally:
+            os.remove(tmp_pdf.name)
+        file.seek(0)
+    return text
+
+
+def extract_text_from_image(file):
+    image = Image.open(file)
+    return pytesseract.image_to_string(image)
+
+
+def extract_text(file, filetype):
+    if filetype == 'pdf':
+        return extract_text_from_pdf(file)
+    elif filetype == 'docx':
+        return extract_text_from_docx(file)
+    elif filetype in ['png', 'jpg', 'jpeg']:
+        return extract_text_from_image(file)
+    else:
+        return ''
+
+
+def contract_model(text):
+    # The contract is part of the cached prefix, so follow-up questions only
+    # send the question itself.
+    return CachedModel(MODEL_NAME, LEGAL_EXPERT_INSTRUCTIONS,
+                       contents=["Contract Text:\n" + text])
+
+
+def analyze_risks(text):
+    """Returns the numbered risk list and the call's ``CallMetrics``."""
+    response, metrics = contract_model(text).generate_with_metrics(RISKS_PROMPT)
+    return response.text, metrics
+
+
+def ask_about_contract(text, question):
+    response, metrics = contract_model(text).generate_with_metrics(question)
+    return response.text, metrics
+
+
+def analyze_file(path):
+    """Extracts a contract from disk and lists its risks, as a JSON-ready dict."""
+    filetype = path.rsplit('.', 1)[-1].lower()
+    with open(path, 'rb') as f:
+        text = extract_text(f, filetype)
+    if not text.strip():
+        raise ValueError('No text could be extracted from the document.')
+    risks, metrics = analyze_risks(text)
+    return {"text": text, "risks": risks, "metrics": asdict(metrics)}
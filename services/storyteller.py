@@ -0,0 +1,40 @@
+"""Short story generation with the Mistral chat completions API."""
+import os
+
+import requests
+
+API_URL = "https://api.mistral.ai/v1/chat/completions"
+MODEL = "mistral-small"  # Or mistral-medium / mistral-tiny
+
+
+def build_messages(user_prompt=""):
+    return [
+        {
+            "role": "system",
+            "content": "You are a creative and imaginative storyteller. Write vivid and short stories."
+        },
+        {
+            "role": "user",
+            "content": f"Write a short story under 300 words{' about ' + user_prompt if user_prompt else ''}."
+        }
+    ]
+
+
+def generate_story(user_prompt="", api_key=None, session=requests):
+    headers = {
+        "Authorization": f"Bearer {api_key or os.getenv('MISTRAL_API_KEY')}",
+        "Content-Type": "application/json"
+    }
+
+    payload = {
+        "model": MODEL,
+        "messages": build_messages(user_prompt),
+        "temperature": 0.9,
+        "max_tokens": 600,
+        "stream": False
+    }
+
+    response = session.post(API_URL, headers=headers, json=payload)
+    result = response.json()
+
+    return result["choices"][0]["message"]["content"].strip()
@@ -0,0 +1,51 @@
+"""YouTube transcript summarization with Gemini."""
+from dataclasses import asdict
+
+from youtube_transcript_api import YouTubeTranscriptApi
+
+from .gemini_cache import CachedModel
+
+MODEL_NAME = "gemini-1.5-flash"
+
+model_behavior = """ You are expert in summarization of youtube video from transcription of video.
+                    So, input is transcription and output will be the summary of the given video including all 
+                    the important information. Please break down the information in multiple paragraph if it becomes
+                    more clear and concise.Please give relevant topic for the summary.
+                    Please try to make the summary in below 1000 words. Please don't add extra information that doesn't
+                    make sense but fix typos and return `Couldn't generate summary for the given video` if transcription is meaningless or empty.
+                    This is the transcriptions for the video.
+                """
+
+# the fixed model behaviour goes in as a (cached) system instruction,
+# so only the transcription is sent per request
+model = CachedModel(model_name=MODEL_NAME, system_instruction=model_behavior)
+
+
+def get_video_transcripts(video_id):
+    transcription_list = YouTubeTranscriptApi.get_transcript(video_id)
+    return " ".join([transcript["text"] for transcript in transcription_list])
+
+
+def get_video_id(url):
+    if "=" not in url:
+        # bare video id or a youtu.be short link
+        return url.rstrip("/").rsplit("/", 1)[-1]
+    video_id = url.split("=")[1]
+    if "&" in video_id:
+        video_id = video_id.split("&")[0]
+
+    return video_id
+
+
+def summarize(transcriptions):
+    """Returns the summary and the call's ``CallMetrics``."""
+    response, metrics = model.generate_with_metrics(transcriptions)
+    return response.text, metrics
+
+
+def summarize_video(url):
+    video_id = get_video_id(url)
+    transcript = get_video_transcripts(video_id)
+    summary, metrics = summarize(transcript)
+    return {"video_id": video_id, "transcript": transcript, "summary": summary,
+            "metrics": asdict(metrics)}
@@ -0,0 +1,165 @@
+"""OCR and Google Translate fan-out used by the translation service.
+
+Each uploaded notice is OCR'd exactly once, then translated into every
+selected language concurrently.  Files are OCR'd in parallel on a bounded
+pool, and translations are submitted to a separate pool as soon as their
+file's text is ready.  Total time is therefore close to one OCR plus the
+slowest translation rather than the sum of all of them.
+"""
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from io import BytesIO
+
+import pytesseract
+from PIL import Image
+from pdf2image import convert_from_bytes
+from docx import Document
+
+# ISO-639-1 codes understood by Google Translate.
+LANGUAGES = {
+    "Hindi": "hi",
+    "Kannada": "kn",
+    "Tamil": "ta",
+    "Telugu": "te",
+    "Malayalam": "ml",
+    "Marathi": "mr",
+    "Bengali": "bn",
+}
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# XML can't hold control characters other than tab, newline and carriage return.
+_XML_INVALID = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_local = threading.local()
+
+
+@dataclass
+class FileTranslation:
+    """OCR text and per-language results for one uploaded file."""
+    name: str
+    original_text: str = ""
+    translations: dict = field(default_factory=dict)  # language name -> text
+    errors: dict = field(default_factory=dict)  # language name (or "ocr") -> message
+
+    @property
+    def stem(self):
+        return os.path.splitext(self.name)[0].replace(" ", "_")
+
+
+def image_to_text(data):
+    return pytesseract.image_to_string(Image.open(BytesIO(data)))
+
+
+def pdf_to_text(data):
+    return "".join(pytesseract.image_to_string(img) for img in convert_from_bytes(data))
+
+
+def extract_text(name, data):
+    if os.path.splitext(name)[1].lower() == ".pdf":
+        return pdf_to_text(data)
+    return image_to_text(data)
+
+
+def _client(api_key):
+    # One client per worker thread; the underlying HTTP session isn't shared.
+    client = getattr(_local, "client", None)
+    if client is None:
+        from google.cloud import translate_v2 as translate
+        from google.auth.api_key import Credentials
+        client = translate.Client(credentials=Credentials(api_key))
+        _local.client = client
+    return client
+
+
+def translate_text(text, target_language, api_key):
+    """Translates text into the target language using an API key."""
+    translation = _client(api_key).translate(text, target_language=target_language)
+    return translation["translatedText"]
+
+
+def create_docx(text):
+    doc = Document()
+    doc.add_paragraph(_XML_INVALID.sub(" ", text))
+    doc_bytes = BytesIO()
+    doc.save(doc_bytes)
+    doc_bytes.seek(0)
+    return doc_bytes
+
+
+def docx_name(result, language):
+    return f"{result.stem}_{LANGUAGES[language]}.docx"
+
+
+def unique_docx_name(result, language, used):
+    """``docx_name`` with a ``_2``, ``_3``... suffix if already in ``used``, which it's added to."""
+    # notice.pdf and notice.png (or a/notice.png and b/notice.png) share a name
+    stem = os.path.splitext(docx_name(result, language))[0]
+    name, n = f"{stem}.docx", 1
+    while name in used:
+        n += 1
+        name = f"{stem}_{n}.docx"
+    used.add(name)
+    return name
+
+
+def create_zip(results):
+    """Bundles one DOCX per file and language into a single ZIP archive."""
+    buffer = BytesIO()
+    used = set()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as bundle:
+        for result in results:
+            for language, text in result.translations.items():
+                bundle.writestr(unique_docx_name(result, language, used), create_docx(text).getvalue())
+    buffer.seek(0)
+    return buffer
+
+
+def translate_files(files, languages, api_key, max_workers=4,
+                    extract=extract_text, translate=translate_text):
+    """OCRs each ``(name, bytes)`` file once and translates it into every language.
+
+    ``max_workers`` bounds the number of files OCR'd at once; translations
+    run on their own pool so a slow OCR never blocks finished files.
+    Returns one ``FileTranslation`` per input file, in input order.
+    """
+    results = [FileTranslation(name) for name, _ in files]
+    if not files:
+        return results
+    translate_workers = max(1, min(32, max_workers * max(1, len(languages))))
+    with ThreadPoolExecutor(max_workers=max_workers) as ocr_pool, \
+            ThreadPoolExecutor(max_workers=translate_workers) as translate_pool:
+        ocr_futures = {
+            ocr_pool.submit(extract, name, data): result
+            for (name, data), result in zip(files, results)
+        }
+        translate_futures = {}
+        for future in as_completed(ocr_futures):
+            result = ocr_futures[future]
+            try:
+                result.original_text = future.result()
+            except Exception as e:
+                result.errors["ocr"] = str(e)
+                continue
+            if not result.original_text.strip():
+                continue
+            for language in languages:
+                translate_futures[translate_pool.submit(
+                    translate, result.original_text, LANGUAGES[language], api_key
+                )] = (result, language)
+
+        for future in as_completed(translate_futures):
+            result, language = translate_futures[future]
+            try:
+                result.translations[language] = future.result()
+            except Exception as e:
+                result.errors[language] = str(e)
+
+    for result in results:
+        # Keep languages in the order the user picked them.
+        result.translations = {l: result.translations[l] for l in languages if l in result.translations}
+    return results
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from services.archive import (
+    DOCUMENT_PARSER, PRESCRIPTION, RISK_ANALYSIS, Archive, fts_query, get_archive,
+)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return Archive(str(tmp_path))
+
+
+def blob_files(archive):
+    return [os.path.join(root, name) for root, _, names in os.walk(archive.blob_dir) for name in names]
+
+
+def test_fts_query_quotes_words_and_prefixes_the_last():
+    assert fts_query("indemnify supplier") == '"indemnify" "supplier"*'
+
+
+def test_fts_query_drops_fts_syntax():
+    assert fts_query('liability OR "data" NEAR(loss)*') == '"liability" "OR" "data" "NEAR" "loss"*'
+
+
+def test_fts_query_without_words():
+    assert fts_query("  -*\"  ") is None
+
+
+def test_record_and_get_round_trip(archive):
+    doc_id = archive.record(RISK_ANALYSIS, "contract.pdf", source=b"%PDF-1.4 contract",
+                            text="The supplier shall indemnify the customer.", output="1. Broad indemnity",
+                            metadata={"pages": 3})
+    doc = archive.get(doc_id)
+    assert doc["app"] == RISK_ANALYSIS
+    assert doc["name"] == "contract.pdf"
+    assert doc["text"] == "The supplier shall indemnify the customer."
+    assert doc["output"] == "1. Broad indemnity"
+    assert doc["metadata"] == {"pages": 3}
+    assert doc["source_size"] == len(b"%PDF-1.4 contract")
+    assert archive.get_blob(doc["source_sha256"]) == b"%PDF-1.4 contract"
+
+
+def test_record_serialises_structured_output(archive):
+    doc_id = archive.record(PRESCRIPTION, "rx.png", output={"patient_name": "Asha Rao"})
+    assert archive.get(doc_id)["output"] == '{"patient_name": "Asha Rao"}'
+
+
+def test_get_unknown_id(archive):
+    assert archive.get(42) is None
+
+
+def test_search_matches_prefixes_and_highlights(archive):
+    archive.record(RISK_ANALYSIS, "a.pdf", text="The supplier shall indemnify the customer.")
+    archive.record(RISK_ANALYSIS, "b.pdf", text="Payment is due within thirty days.")
+    results = archive.search("supplier indemn")
+    assert [r["name"] for r in results] == ["a.pdf"]
+    assert "**indemnify**" in results[0]["snippet"]
+
+
+def test_search_requires_every_word(archive):
+    archive.record(RISK_ANALYSIS, "a.pdf", text="supplier liability")
+    assert archive.search("supplier payment") == []
+
+
+def test_search_covers_names_and_outputs(archive):
+    archive.record(RISK_ANALYSIS, "lease_agreement.pdf", text="", output="Unlimited liability for the tenant")
+    assert [r["name"] for r in archive.search("lease")] == ["lease_agreement.pdf"]
+    assert [r["name"] for r in archive.search("tenant")] == ["lease_agreement.pdf"]
+
+
+def test_search_filters_by_app(archive):
+    archive.record(RISK_ANALYSIS, "a.pdf", text="termination clause")
+    archive.record(DOCUMENT_PARSER, "a.pdf", text="termination clause")
+    assert [r["app"] for r in archive.search("termination", app=DOCUMENT_PARSER)] == [DOCUMENT_PARSER]
+    assert len(archive.search("termination")) == 2
+
+
+def test_search_without_words(archive):
+    archive.record(RISK_ANALYSIS, "a.pdf", text="anything")
+    assert archive.search("***") == []
+
+
+def test_identical_sources_share_one_compressed_blob(archive):
+    data = b"same upload " * 1000
+    first = archive.record(RISK_ANALYSIS, "a.pdf", source=data)
+    second = archive.record(DOCUMENT_PARSER, "copy.pdf", source=data)
+    assert archive.get(first)["source_sha256"] == archive.get(second)["source_sha256"]
+    files = blob_files(archive)
+    assert len(files) == 1
+    assert os.path.getsize(files[0]) < len(data)
+
+
+def test_find_by_source_returns_latest_for_the_app(archive):
+    data = b"%PDF contract"
+    archive.record(RISK_ANALYSIS, "contract.pdf", source=data, output="old")
+    archive.record(RISK_ANALYSIS, "contract.pdf", source=data, output="new")
+    archive.record(DOCUMENT_PARSER, "contract.pdf", source=data, output="parsed")
+    assert archive.find_by_source(RISK_ANALYSIS, data)["output"] == "new"
+    assert archive.find_by_source(RISK_ANALYSIS, b"other bytes") is None
+    assert archive.find_by_source(PRESCRIPTION, data) is None
+
+
+def test_recent_and_apps(archive):
+    archive.record(RISK_ANALYSIS, "a.pdf")
+    archive.record(DOCUMENT_PARSER, "b.pdf")
+    assert [r["name"] for r in archive.recent()] == ["b.pdf", "a.pdf"]
+    assert [r["name"] for r in archive.recent(app=RISK_ANALYSIS)] == ["a.pdf"]
+    assert archive.apps() == [DOCUMENT_PARSER, RISK_ANALYSIS]
+
+
+def test_reopening_keeps_documents(tmp_path):
+    Archive(str(tmp_path)).record(RISK_ANALYSIS, "a.pdf", text="persisted")
+    assert [r["name"] for r in Archive(str(tmp_path)).search("persisted")] == ["a.pdf"]
+
+
+def test_get_archive_uses_archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path / "store"))
+    archive = get_archive()
+    assert archive.root == str(tmp_path / "store")
+    assert get_archive() is archive
@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+
+import pytest
+
+from benchmarks import fakes
+from benchmarks.run import CORPUS_DIR
+from services import cli
+from services.archive import DIAGNOSIS, RISK_ANALYSIS, STORY_TELLER, TRANSLATION, Archive
+
+
+def touch(path, data=b"x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def corpus(name, dest):
+    with open(os.path.join(CORPUS_DIR, name), "rb") as f:
+        return touch(dest, f.read())
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_expand_inputs_walks_directories_for_accepted_types(tmp_path):
+    b = touch(tmp_path / "docs" / "b.PDF")
+    a = touch(tmp_path / "docs" / "a.pdf")
+    nested = touch(tmp_path / "docs" / "sub" / "c.docx")
+    touch(tmp_path / "docs" / "notes.txt")
+    assert list(cli.expand_inputs([str(tmp_path / "docs")], ["pdf", "docx"])) == [a, b, nested]
+
+
+def test_expand_inputs_globs_and_plain_files(tmp_path):
+    one = touch(tmp_path / "one.png")
+    two = touch(tmp_path / "two.png")
+    jpg = touch(tmp_path / "scan.jpg")
+    assert list(cli.expand_inputs([str(tmp_path / "*.png"), jpg], ["png", "jpg"])) == [one, two, jpg]
+
+
+@pytest.mark.parametrize("item", ["missing.pdf", "nothing-*.pdf"])
+def test_expand_inputs_rejects_unmatched_items(tmp_path, item):
+    with pytest.raises(SystemExit, match="No input files match"):
+        list(cli.expand_inputs([str(tmp_path / item)], ["pdf"]))
+
+
+def test_expand_inputs_rejects_directory_without_accepted_files(tmp_path):
+    touch(tmp_path / "docs" / "notes.txt")
+    with pytest.raises(SystemExit):
+        list(cli.expand_inputs([str(tmp_path / "docs")], ["pdf"]))
+
+
+@pytest.fixture
+def env(monkeypatch, tmp_path):
+    monkeypatch.setenv("GOOGLE_TRANSLATION_API_KEY", "fake-key")
+    monkeypatch.setenv("MISTRAL_API_KEY", "fake-key")
+    monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path / "archive"))
+
+
+def test_exit_status_is_zero_when_every_input_succeeds(env, tmp_path):
+    out = tmp_path / "stories.jsonl"
+    with fakes.install(fakes.Backend()):
+        assert cli.main(["story", "a fox", "a river", "-o", str(out)]) == 0
+    records = read_jsonl(out)
+    assert sorted(r["input"] for r in records) == ["a fox", "a river"]
+    assert all("error" not in r for r in records)
+
+
+def test_exit_status_is_one_when_any_input_fails(env, tmp_path):
+    out = tmp_path / "stories.jsonl"
+    with fakes.install(fakes.Backend(failure_rate=1.0)):
+        assert cli.main(["story", "a fox", "-o", str(out)]) == 1
+    [record] = read_jsonl(out)
+    assert "injected mistral failure" in record["error"]
+
+
+def test_output_dir_names_stay_unique_for_shared_stems(env, tmp_path):
+    inputs = [corpus("notice.png", tmp_path / "a" / "notice.png"),
+              corpus("notice.png", tmp_path / "b" / "notice.png"),
+              corpus("notice.pdf", tmp_path / "a" / "notice.pdf")]
+    out_dir, out = tmp_path / "docx", tmp_path / "out.jsonl"
+    with fakes.install(fakes.Backend()):
+        status = cli.main(["translate", *inputs, "-l", "hi", "--output-dir", str(out_dir),
+                           "-o", str(out)])
+    assert status == 0
+    written = [path for record in read_jsonl(out) for path in record["docx"]]
+    assert sorted(os.path.basename(p) for p in written) == [
+        "notice_hi.docx", "notice_hi_2.docx", "notice_hi_3.docx"]
+    assert sorted(os.listdir(out_dir)) == sorted(os.path.basename(p) for p in written)
+
+
+def test_only_successful_records_are_archived(env, tmp_path):
+    out = str(tmp_path / "out.jsonl")
+    with fakes.install(fakes.Backend()):
+        cli.main(["story", "a fox", "--archive", "-o", out])
+    with fakes.install(fakes.Backend(failure_rate=1.0)):
+        cli.main(["story", "a river", "--archive", "-o", out])
+    assert [(d["app"], d["name"]) for d in Archive(str(tmp_path / "archive")).recent()] == [
+        (STORY_TELLER, "a fox")]
+
+
+def test_archive_record_matches_the_translation_page(tmp_path):
+    archive = Archive(str(tmp_path / "archive"))
+    source = touch(tmp_path / "notice.png", b"png bytes")
+    args = argparse.Namespace(archive_app=TRANSLATION)
+    cli.archive_record(archive, args, {"input": source, "original_text": "Notice",
+                                       "translations": {"Hindi": "soochana"}})
+    [doc] = archive.recent()
+    doc = archive.get(doc["id"])
+    assert doc["app"] == TRANSLATION
+    assert doc["name"] == "notice.png"
+    assert doc["text"] == "Notice"
+    assert "soochana" in doc["output"]
+    assert doc["metadata"] == {"languages": ["Hindi"]}
+    assert archive.find_by_source(TRANSLATION, b"png bytes")["id"] == doc["id"]
+
+
+def test_archive_record_for_risk_analysis_keeps_text_and_risks(tmp_path):
+    archive = Archive(str(tmp_path / "archive"))
+    source = touch(tmp_path / "contract.pdf", b"%PDF contract")
+    cli.archive_record(archive, argparse.Namespace(archive_app=RISK_ANALYSIS),
+                       {"input": source, "text": "The supplier shall indemnify.", "risks": "1. Indemnity"})
+    doc = archive.find_by_source(RISK_ANALYSIS, b"%PDF contract")
+    assert (doc["name"], doc["text"], doc["output"]) == (
+        "contract.pdf", "The supplier shall indemnify.", "1. Indemnity")
+
+
+def test_archive_record_without_a_source_file(tmp_path):
+    archive = Archive(str(tmp_path / "archive"))
+    cli.archive_record(archive, argparse.Namespace(archive_app=STORY_TELLER),
+                       {"input": "a fox", "story": "Once upon a time"})
+    cli.archive_record(archive, argparse.Namespace(archive_app=DIAGNOSIS, symptoms="Dry cough"),
+                       {"input": None, "diagnosis": "Likely bronchitis"})
+    story, diagnosis = (archive.get(d["id"]) for d in reversed(archive.recent()))
+    assert (story["name"], story["text"], story["source_sha256"]) == ("a fox", "a fox", None)
+    assert (diagnosis["name"], diagnosis["text"]) == ("Dry cough", "Dry cough")
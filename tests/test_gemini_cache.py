@@ -0,0 +1,144 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+from google.generativeai import caching
+
+from benchmarks import fakes
+from services import gemini_cache
+from services.gemini_cache import CachedModel
+
+LARGE = "Clause: the supplier shall deliver on time. " * 120  # above MIN_CACHE_TOKENS
+SMALL = "Answer briefly."
+
+
+@pytest.fixture
+def backend():
+    backend = fakes.Backend()
+    with fakes.install(backend):
+        yield backend
+
+
+def creations():
+    return sum(stats.creations for stats in gemini_cache._stats.values())
+
+
+def test_first_call_is_uncached_and_creates_no_cache(backend):
+    model = CachedModel("gemini-1.5-flash", LARGE)
+    _, metrics = model.generate_with_metrics("What are the risks?")
+    assert not metrics.cached
+    assert metrics.cached_tokens == 0
+    assert metrics.creation_latency == 0.0
+    assert backend.calls == 1
+    assert creations() == 0
+
+
+def test_cache_is_created_when_the_prefix_is_reused(backend):
+    model = CachedModel("gemini-1.5-flash", LARGE)
+    model.generate_with_metrics("What are the risks?")
+    _, second = model.generate_with_metrics("Who pays for delays?")
+    _, third = model.generate_with_metrics("Can it be terminated?")
+    assert second.cached and third.cached
+    assert second.cached_tokens > 0
+    assert model.stats.creations == 1
+    assert third.creation_latency == 0.0
+
+
+def test_concurrent_callers_create_one_cache():
+    # A slow backend keeps creation in flight while the other threads arrive.
+    with fakes.install(fakes.Backend(latency=0.02)):
+        model = CachedModel("gemini-1.5-flash", LARGE)
+        model.generate_with_metrics("warm up")
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(model.generate_with_metrics("q")[1]))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert model.stats.creations == 1
+        assert len(results) == 8 and all(m.cached for m in results)
+
+
+def test_small_prefix_is_never_cached(backend):
+    model = CachedModel("gemini-1.5-flash", SMALL)
+    for _ in range(3):
+        _, metrics = model.generate_with_metrics("hello")
+        assert not metrics.cached
+    assert creations() == 0
+
+
+def test_transient_creation_error_is_retried_next_call(backend):
+    model = CachedModel("gemini-1.5-flash", LARGE)
+    model.generate_with_metrics("first")
+    with mock.patch.object(caching.CachedContent, "create",
+                           side_effect=google_exceptions.ServiceUnavailable("busy")):
+        _, metrics = model.generate_with_metrics("second")
+    assert not metrics.cached
+    _, metrics = model.generate_with_metrics("third")
+    assert metrics.cached
+    assert model.stats.creations == 1
+
+
+def test_unsupported_prefix_is_remembered(backend):
+    model = CachedModel("gemini-1.5-flash", LARGE)
+    model.generate_with_metrics("first")
+    create = mock.Mock(side_effect=google_exceptions.InvalidArgument("too small"))
+    with mock.patch.object(caching.CachedContent, "create", create):
+        for _ in range(3):
+            _, metrics = model.generate_with_metrics("again")
+            assert not metrics.cached
+    assert create.call_count == 1
+
+
+def test_expired_cache_is_invalidated_and_prompt_resent_in_full(backend):
+    model = CachedModel("gemini-1.5-flash", SMALL, contents=[LARGE])
+    model.generate_with_metrics("first")
+    model.generate_with_metrics("second")
+    sent = []
+
+    class Expired:
+        def generate_content(self, parts, **kwargs):
+            raise google_exceptions.NotFound("cache gone")
+
+    real = fakes.fake_gemini(backend)[0]
+
+    class Recording(real):
+        def generate_content(self, parts, **kwargs):
+            sent.append(parts)
+            return super().generate_content(parts, **kwargs)
+
+    with mock.patch("google.generativeai.GenerativeModel", Recording), \
+            mock.patch.object(Recording, "from_cached_content", lambda **kw: Expired()):
+        _, metrics = model.generate_with_metrics("third")
+    assert not metrics.cached
+    assert sent == [[LARGE, "third"]]
+    assert model.key not in gemini_cache._handles
+
+
+def test_latency_saved_only_against_the_same_prompt(backend):
+    model = CachedModel("gemini-1.5-flash", LARGE)
+    model.generate_with_metrics("List the risks.")
+    _, other = model.generate_with_metrics("A short follow-up?")
+    assert other.cached
+    assert other.latency_saved is None
+    _, same = model.generate_with_metrics("List the risks.")
+    assert same.cached
+    assert same.latency_saved is not None
+    assert "saved vs the same prompt uncached" in same.summary()
+    assert "saved vs" not in other.summary()
+
+
+def test_expired_entries_are_evicted(backend):
+    old = CachedModel("gemini-1.5-flash", LARGE)
+    old.generate_with_metrics("first")
+    old.generate_with_metrics("second")
+    assert old.key in gemini_cache._handles and old.key in gemini_cache._stats
+
+    later = time.time() + gemini_cache.DEFAULT_TTL.total_seconds() + 1
+    with mock.patch.object(gemini_cache.time, "time", return_value=later):
+        CachedModel("gemini-1.5-flash", SMALL).generate_with_metrics("hello")
+    assert old.key not in gemini_cache._handles
+    assert old.key not in gemini_cache._stats
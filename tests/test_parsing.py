@@ -0,0 +1,57 @@
+import asyncio
+import os
+
+from services.parsing import PAGE_CHARS, paginate, parse_files
+
+
+class RecordingParser:
+    """LlamaParse stand-in that remembers the temp file it was given."""
+
+    def __init__(self, delays=None, fail=()):
+        self.delays = delays or {}
+        self.fail = fail
+        self.paths = []
+
+    async def aload_data(self, path):
+        self.paths.append(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        await asyncio.sleep(self.delays.get(data, 0))
+        if data in self.fail:
+            raise RuntimeError("parse failed")
+        return [type("Document", (), {"text": data.decode()})()]
+
+
+def test_results_arrive_as_files_finish_with_their_input_index():
+    parser = RecordingParser(delays={b"slow": 0.05})
+    results = list(parse_files([("slow.pdf", b"slow"), ("fast.docx", b"fast")], workers=2, parser=parser))
+    assert [(r.name, r.index) for r in results] == [("fast.docx", 1), ("slow.pdf", 0)]
+    assert results[1].pages == ["slow"]
+
+
+def test_temp_files_are_removed_after_success_and_failure():
+    parser = RecordingParser(fail=(b"bad",))
+    results = list(parse_files([("good.pdf", b"good"), ("bad.pdf", b"bad")], parser=parser))
+    assert sorted(r.error or "" for r in results) == ["", "parse failed"]
+    assert len(parser.paths) == 2
+    assert [p for p in parser.paths if os.path.exists(p)] == []
+
+
+def test_temp_files_are_removed_when_the_consumer_stops_early():
+    parser = RecordingParser(delays={b"slow": 10})
+    results = parse_files([("fast.pdf", b"fast"), ("slow.pdf", b"slow")], workers=2, parser=parser)
+    assert next(results).name == "fast.pdf"
+    results.close()
+    assert len(parser.paths) == 2
+    assert [p for p in parser.paths if os.path.exists(p)] == []
+
+
+def test_temp_files_keep_the_upload_extension():
+    parser = RecordingParser()
+    list(parse_files([("scan.jpeg", b"x")], parser=parser))
+    assert parser.paths[0].endswith(".jpeg")
+
+
+def test_paginate_splits_long_text():
+    pages = paginate(["a" * (PAGE_CHARS * 2 + 1), "short", ""])
+    assert [len(p) for p in pages] == [PAGE_CHARS, PAGE_CHARS, 1, 5, 0]
@@ -0,0 +1,87 @@
+import time
+import zipfile
+
+from services.translation import FileTranslation, create_zip, translate_files
+
+FILES = [("slow.pdf", b"slow"), ("fast.png", b"fast"), ("medium.jpg", b"medium")]
+DELAYS = {b"slow": 0.06, b"fast": 0.0, b"medium": 0.03}
+
+
+def extract(name, data):
+    time.sleep(DELAYS.get(data, 0))
+    return f"text of {name}"
+
+
+def translate(text, code, api_key):
+    # Hindi finishes last, so results arrive in the opposite order to the request.
+    time.sleep(0.03 if code == "hi" else 0.0)
+    return f"[{code}] {text}"
+
+
+def test_results_follow_input_and_language_order():
+    results = translate_files(FILES, ["Hindi", "Tamil"], "key", max_workers=3,
+                              extract=extract, translate=translate)
+    assert [r.name for r in results] == ["slow.pdf", "fast.png", "medium.jpg"]
+    for result in results:
+        assert list(result.translations) == ["Hindi", "Tamil"]
+        assert result.translations["Tamil"] == f"[ta] text of {result.name}"
+        assert result.errors == {}
+
+
+def test_each_file_is_ocrd_once():
+    calls = []
+
+    def counting_extract(name, data):
+        calls.append(name)
+        return "text"
+
+    translate_files(FILES, ["Hindi", "Tamil", "Kannada"], "key", extract=counting_extract, translate=translate)
+    assert sorted(calls) == sorted(name for name, _ in FILES)
+
+
+def test_ocr_failure_is_reported_per_file():
+    def failing_extract(name, data):
+        if name == "fast.png":
+            raise RuntimeError("tesseract crashed")
+        return "text"
+
+    results = translate_files(FILES, ["Hindi"], "key", extract=failing_extract, translate=translate)
+    assert results[1].errors == {"ocr": "tesseract crashed"}
+    assert results[1].translations == {}
+    assert results[0].translations == {"Hindi": "[hi] text"}
+
+
+def test_translation_failure_keeps_other_languages():
+    def failing_translate(text, code, api_key):
+        if code == "kn":
+            raise RuntimeError("quota exceeded")
+        return code
+
+    [result] = translate_files(FILES[:1], ["Hindi", "Kannada", "Tamil"], "key",
+                               extract=extract, translate=failing_translate)
+    assert result.errors == {"Kannada": "quota exceeded"}
+    assert result.translations == {"Hindi": "hi", "Tamil": "ta"}
+
+
+def test_blank_text_is_not_translated():
+    calls = []
+
+    def recording_translate(text, code, api_key):
+        calls.append(code)
+        return text
+
+    [result] = translate_files(FILES[:1], ["Hindi"], "key", extract=lambda name, data: "  \n",
+                               translate=recording_translate)
+    assert calls == []
+    assert result.translations == {} and result.errors == {}
+
+
+def test_no_files():
+    assert translate_files([], ["Hindi"], "key", extract=extract, translate=translate) == []
+
+
+def test_zip_entries_stay_unique_for_shared_stems():
+    results = [FileTranslation("notice.pdf", translations={"Hindi": "a"}),
+               FileTranslation("notice.png", translations={"Hindi": "b"})]
+    with zipfile.ZipFile(create_zip(results)) as bundle:
+        assert bundle.namelist() == ["notice_hi.docx", "notice_hi_2.docx"]